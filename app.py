@@ -287,13 +287,23 @@ def render_analysis_dashboard():
             # Generate summary using GPT if available
             if st.session_state.gpt_client.is_configured():
                 with st.spinner("Generating summary..."):
+                    # Show the summary as it streams in
+                    placeholder = st.empty()
+                    streamed = []
+                    
+                    def show_delta(delta):
+                        streamed.append(delta)
+                        placeholder.markdown(''.join(streamed))
+                    
                     response = st.session_state.gpt_client.generate_summary(
-                        st.session_state.contract_text
+                        st.session_state.contract_text,
+                        on_delta=show_delta
                     )
                     if response.success:
                         results['summary'] = response.content
-                        st.markdown(response.content)
+                        placeholder.markdown(response.content)
                     else:
+                        placeholder.empty()
                         st.warning("Could not generate AI summary. Showing basic analysis.")
                         show_basic_summary(results)
             else:
@@ -566,14 +576,24 @@ def render_clause_analysis():
             if st.session_state.gpt_client.is_configured():
                 if st.button(f"🤖 Explain in Simple Terms", key=f"explain_{i}"):
                     with st.spinner("Generating explanation..."):
+                        # Show the explanation as it streams in
+                        placeholder = st.empty()
+                        heading = "---\n### Plain Language Explanation\n\n"
+                        streamed = []
+                        
+                        def show_delta(delta):
+                            streamed.append(delta)
+                            placeholder.markdown(heading + ''.join(streamed))
+                        
                         response = st.session_state.gpt_client.explain_clause(
                             clause.content,
-                            clause.clause_type.value if hasattr(clause.clause_type, 'value') else str(clause.clause_type)
+                            clause.clause_type.value if hasattr(clause.clause_type, 'value') else str(clause.clause_type),
+                            on_delta=show_delta
                         )
                         if response.success:
-                            st.markdown("---")
-                            st.markdown("### Plain Language Explanation")
-                            st.markdown(response.content)
+                            placeholder.markdown(heading + response.content)
+                        else:
+                            placeholder.empty()
 
 
 def render_risk_assessment():
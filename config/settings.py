@@ -26,6 +26,17 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_MODEL = "gpt-5-mini"
 OPENAI_MAX_TOKENS = 4096
 OPENAI_TEMPERATURE = 0.3  # Lower temperature for legal analysis accuracy
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+OPENAI_MAX_CONCURRENT_REQUESTS = 10  # Per client, for the async methods
+OPENAI_MAX_RETRIES = 5  # Rate-limit and connection retries, with backoff
+# JSON schema responses (the prompts then leave out their example JSON);
+# set to false for models without structured output support
+OPENAI_STRUCTURED_OUTPUTS = os.getenv("OPENAI_STRUCTURED_OUTPUTS", "true").lower() == "true"
+
+# Reuse answers for near-duplicate contract text (off by default: similar
+# contracts can differ in the one clause that matters)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = 0.95  # Minimum cosine similarity for a cache hit
 
 # Contract Types
 CONTRACT_TYPES = [
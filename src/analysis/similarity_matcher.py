@@ -4,10 +4,54 @@ Compares contract clauses against standard templates
 """
 
 import re
-from typing import Dict, List, Tuple, Optional
+import sys
+import copy
+import math
+import hashlib
+import functools
+import threading
+from bisect import bisect_right
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple, Optional
 from dataclasses import dataclass
 from difflib import SequenceMatcher
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Sentence boundaries are '.' and ';'; mapping ';' to '.' lets a plain
+# str.split do the work of re.split(r'[.;]', ...)
+_SENTENCE_SPLIT_TRANS = str.maketrans(';', '.')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Alphanumeric runs; punctuation and underscores separate tokens
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+# Important legal terms that might be missing from a matched clause
+# (tuples keep the reported differences in a stable order)
+_IMPORTANT_TERMS = tuple(map(sys.intern, (
+    'shall', 'must', 'may', 'written', 'notice', 'days',
+    'liability', 'indemnify', 'terminate', 'confidential'
+)))
+
+# Terms that are a concern when added to a clause
+_CONCERNING_TERMS = tuple(map(sys.intern, (
+    'unlimited', 'perpetual', 'irrevocable', 'sole discretion'
+)))
+
+# Similarity a section must exceed to count as a match
+_MIN_MATCH_SCORE = 0.2
+
+# Fraction of a template's keywords a section must contain to be considered
+_MIN_KEYWORD_FRACTION = 0.3
+
+# Lower score bounds of each match type, ascending, and the matching labels
+_MATCH_TYPE_BOUNDS = (0.2, 0.4, 0.6, 0.8)
+_MATCH_TYPES = ("no_match", "low", "medium", "high", "exact")
+
+# Number of recent comparison reports kept
+_REPORT_CACHE_SIZE = 128
 
 
 @dataclass
@@ -33,193 +77,318 @@ class TemplateComparisonReport:
     recommendations: List[str]
 
 
-class SimilarityMatcher:
-    """
-    Compares contract clauses against standard templates.
-    Uses text similarity algorithms and pattern matching.
+# Shared by all matchers (the app creates one per analysis); keyed by
+# (contract text digest, contract type). Entries are private copies and
+# every hit returns a fresh copy, so callers may mutate their report.
+_report_cache: "OrderedDict[Tuple[bytes, str], TemplateComparisonReport]" = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class _TemplateTable:
+    """Flattened templates for one contract type, as parallel tuples."""
+    names: Tuple[str, ...]
+    labels: Tuple[str, ...]  # display names used for missing clauses
+    infos: Tuple[Mapping, ...]
+    required: Tuple[bool, ...]
+    required_count: int
+
+
+@dataclass
+class _SentenceIndex:
+    """Per-sentence data for one contract, shared by all template matches."""
+    sentences: List[str]
+    keyword_bits: List[int]  # keyword bitmap for each sentence
+    text_bits: int  # keyword bitmap for the whole text
+    tokens: List[frozenset]  # token set for each sentence
+    joined: str  # sentences joined with '. ', as sections are reported
+    offsets: List[int]  # start of each sentence in joined, plus a final end
+
+
+@dataclass(frozen=True)
+class _TemplateData:
+    """Read-only template tables shared by all matchers."""
+    standard_templates: Mapping[str, Mapping[str, Mapping]]
+    universal_clauses: Mapping[str, Mapping]
+    keyword_bits: Mapping[str, int]  # bit assigned to each distinct keyword
+    tables: Mapping[str, _TemplateTable]
+    universal_table: _TemplateTable
+
+
+def _build_template_table(templates: Mapping[str, Mapping]) -> _TemplateTable:
+    """Flatten a clause-name -> template-info mapping into parallel tuples."""
+    names = tuple(templates)
+    infos = tuple(templates.values())
+    required = tuple(info['required'] for info in infos)
+    return _TemplateTable(
+        names=names,
+        labels=tuple(name.replace('_', ' ').title() for name in names),
+        infos=infos,
+        required=required,
+        required_count=sum(required)
+    )
+
+
+@functools.cache
+def _build_templates() -> _TemplateData:
     """
+    Build the standard clause templates and their precomputed lookups.
     
-    def __init__(self):
-        # Standard clause templates for different contract types
-        self.standard_templates = {
-            "Employment Agreement": {
-                "definitions": {
-                    "template": "In this Agreement, unless the context otherwise requires, the following terms shall have the meanings assigned to them: 'Company' means [Company Name]; 'Employee' means [Employee Name]; 'Effective Date' means the date of commencement of employment.",
-                    "required": True,
-                    "keywords": ["definitions", "means", "shall have the meaning"]
-                },
-                "position_duties": {
-                    "template": "The Employee shall be employed in the position of [Designation] and shall perform such duties as may be assigned by the Company from time to time. The Employee shall report to [Reporting Manager].",
-                    "required": True,
-                    "keywords": ["position", "duties", "designation", "report to"]
-                },
-                "compensation": {
-                    "template": "The Company shall pay the Employee a gross salary of INR [Amount] per annum, payable in monthly installments. The salary shall be subject to applicable tax deductions.",
-                    "required": True,
-                    "keywords": ["salary", "compensation", "payment", "per annum", "monthly"]
-                },
-                "working_hours": {
-                    "template": "The normal working hours shall be [X] hours per day, [Y] days per week. The Employee may be required to work additional hours as necessary for the proper performance of duties.",
-                    "required": True,
-                    "keywords": ["working hours", "hours per day", "days per week"]
-                },
-                "leave": {
-                    "template": "The Employee shall be entitled to [X] days of paid leave per annum, in addition to public holidays as declared by the Company.",
-                    "required": True,
-                    "keywords": ["leave", "paid leave", "holidays", "vacation"]
-                },
-                "confidentiality": {
-                    "template": "The Employee shall maintain strict confidentiality of all proprietary information, trade secrets, and confidential business information of the Company, both during and after employment.",
-                    "required": True,
-                    "keywords": ["confidential", "proprietary", "trade secret"]
-                },
-                "termination": {
-                    "template": "Either party may terminate this Agreement by giving [X] days written notice. The Company may terminate immediately for cause including misconduct, breach of duties, or violation of company policies.",
-                    "required": True,
-                    "keywords": ["terminate", "termination", "notice period"]
-                },
-                "non_compete": {
-                    "template": "For a period of [X] months after termination, the Employee shall not engage in any business that directly competes with the Company within [geographic area].",
-                    "required": False,
-                    "keywords": ["non-compete", "compete", "restriction"]
-                }
+    Built on first use and shared, read-only, by every SimilarityMatcher.
+    """
+    # Standard clause templates for different contract types
+    standard_templates = {
+        "Employment Agreement": {
+            "definitions": {
+                "template": "In this Agreement, unless the context otherwise requires, the following terms shall have the meanings assigned to them: 'Company' means [Company Name]; 'Employee' means [Employee Name]; 'Effective Date' means the date of commencement of employment.",
+                "required": True,
+                "keywords": ["definitions", "means", "shall have the meaning"]
             },
-            "Service Contract": {
-                "definitions": {
-                    "template": "In this Agreement: 'Client' means [Client Name]; 'Service Provider' means [Provider Name]; 'Services' means the services described in Schedule A; 'Deliverables' means the work products to be delivered.",
-                    "required": True,
-                    "keywords": ["definitions", "client", "service provider", "services"]
-                },
-                "scope_of_services": {
-                    "template": "The Service Provider shall provide the Services as described in Schedule A attached hereto. Any changes to the scope shall be agreed in writing by both parties.",
-                    "required": True,
-                    "keywords": ["scope", "services", "schedule", "deliverables"]
-                },
-                "payment_terms": {
-                    "template": "The Client shall pay the Service Provider [Amount] for the Services. Payment shall be made within [X] days of receipt of invoice. Late payments shall attract interest at [Y]% per annum.",
-                    "required": True,
-                    "keywords": ["payment", "invoice", "fees", "compensation"]
-                },
-                "timeline": {
-                    "template": "The Services shall be completed within [X] days/months from the Effective Date. Milestones and deadlines are set forth in Schedule B.",
-                    "required": True,
-                    "keywords": ["timeline", "deadline", "milestone", "completion"]
-                },
-                "warranties": {
-                    "template": "The Service Provider warrants that the Services shall be performed in a professional and workmanlike manner in accordance with industry standards.",
-                    "required": True,
-                    "keywords": ["warranty", "warrants", "professional", "standards"]
-                },
-                "intellectual_property": {
-                    "template": "All intellectual property created in the course of providing Services shall belong to [Party]. The other party is granted a [license type] license to use such IP.",
-                    "required": True,
-                    "keywords": ["intellectual property", "ip", "ownership", "license"]
-                },
-                "limitation_of_liability": {
-                    "template": "The total liability of the Service Provider under this Agreement shall not exceed the total fees paid by the Client. Neither party shall be liable for indirect, consequential, or punitive damages.",
-                    "required": True,
-                    "keywords": ["liability", "limitation", "damages", "cap"]
-                },
-                "termination": {
-                    "template": "Either party may terminate this Agreement with [X] days written notice. Upon termination, the Client shall pay for all Services rendered up to the termination date.",
-                    "required": True,
-                    "keywords": ["terminate", "termination", "notice"]
-                }
+            "position_duties": {
+                "template": "The Employee shall be employed in the position of [Designation] and shall perform such duties as may be assigned by the Company from time to time. The Employee shall report to [Reporting Manager].",
+                "required": True,
+                "keywords": ["position", "duties", "designation", "report to"]
             },
-            "Non-Disclosure Agreement": {
-                "definitions": {
-                    "template": "'Confidential Information' means any information disclosed by the Disclosing Party to the Receiving Party, whether orally, in writing, or by inspection, that is designated as confidential or would reasonably be understood to be confidential.",
-                    "required": True,
-                    "keywords": ["confidential information", "disclosing party", "receiving party"]
-                },
-                "obligations": {
-                    "template": "The Receiving Party shall: (a) maintain the confidentiality of the Confidential Information; (b) not disclose it to any third party without prior written consent; (c) use it only for the Purpose.",
-                    "required": True,
-                    "keywords": ["maintain", "not disclose", "third party", "purpose"]
-                },
-                "exclusions": {
-                    "template": "Confidential Information does not include information that: (a) is publicly available; (b) was known to the Receiving Party prior to disclosure; (c) is independently developed; (d) is disclosed by a third party without breach.",
-                    "required": True,
-                    "keywords": ["exclude", "publicly available", "independently developed"]
-                },
-                "term": {
-                    "template": "This Agreement shall remain in effect for [X] years from the Effective Date. The confidentiality obligations shall survive termination for [Y] years.",
-                    "required": True,
-                    "keywords": ["term", "years", "survive", "termination"]
-                },
-                "return_of_information": {
-                    "template": "Upon termination or request, the Receiving Party shall promptly return or destroy all Confidential Information and certify such destruction in writing.",
-                    "required": True,
-                    "keywords": ["return", "destroy", "certify"]
-                }
+            "compensation": {
+                "template": "The Company shall pay the Employee a gross salary of INR [Amount] per annum, payable in monthly installments. The salary shall be subject to applicable tax deductions.",
+                "required": True,
+                "keywords": ["salary", "compensation", "payment", "per annum", "monthly"]
             },
-            "Lease Agreement": {
-                "premises": {
-                    "template": "The Lessor hereby leases to the Lessee the premises located at [Address], comprising [description of premises] for the purpose of [permitted use].",
-                    "required": True,
-                    "keywords": ["premises", "located at", "address", "property"]
-                },
-                "term": {
-                    "template": "The lease shall commence on [Start Date] and continue for a period of [X] months/years, unless terminated earlier in accordance with this Agreement.",
-                    "required": True,
-                    "keywords": ["term", "commence", "period", "months", "years"]
-                },
-                "rent": {
-                    "template": "The Lessee shall pay a monthly rent of INR [Amount], payable on or before the [X]th day of each month. Rent shall be paid by [payment method].",
-                    "required": True,
-                    "keywords": ["rent", "monthly", "payable", "payment"]
-                },
-                "security_deposit": {
-                    "template": "The Lessee shall pay a security deposit of INR [Amount] upon execution of this Agreement. The deposit shall be refunded within [X] days of termination, less any deductions for damages.",
-                    "required": True,
-                    "keywords": ["security deposit", "deposit", "refund"]
-                },
-                "maintenance": {
-                    "template": "The Lessee shall maintain the premises in good condition. The Lessor shall be responsible for structural repairs and major maintenance.",
-                    "required": True,
-                    "keywords": ["maintenance", "repair", "condition"]
-                },
-                "termination": {
-                    "template": "Either party may terminate this lease by giving [X] months written notice. Early termination by the Lessee may result in forfeiture of the security deposit.",
-                    "required": True,
-                    "keywords": ["terminate", "termination", "notice", "early termination"]
-                }
-            }
-        }
-        
-        # Standard clauses that should be in most contracts
-        self.universal_clauses = {
-            "governing_law": {
-                "template": "This Agreement shall be governed by and construed in accordance with the laws of India. The courts of [City] shall have exclusive jurisdiction.",
+            "working_hours": {
+                "template": "The normal working hours shall be [X] hours per day, [Y] days per week. The Employee may be required to work additional hours as necessary for the proper performance of duties.",
                 "required": True,
-                "keywords": ["governing law", "jurisdiction", "courts", "laws of india"]
+                "keywords": ["working hours", "hours per day", "days per week"]
             },
-            "dispute_resolution": {
-                "template": "Any dispute arising out of this Agreement shall first be attempted to be resolved through mutual negotiation. If unresolved, the dispute shall be referred to arbitration/mediation.",
+            "leave": {
+                "template": "The Employee shall be entitled to [X] days of paid leave per annum, in addition to public holidays as declared by the Company.",
                 "required": True,
-                "keywords": ["dispute", "resolution", "arbitration", "mediation", "negotiation"]
+                "keywords": ["leave", "paid leave", "holidays", "vacation"]
             },
-            "entire_agreement": {
-                "template": "This Agreement constitutes the entire agreement between the parties and supersedes all prior negotiations, representations, and agreements.",
+            "confidentiality": {
+                "template": "The Employee shall maintain strict confidentiality of all proprietary information, trade secrets, and confidential business information of the Company, both during and after employment.",
                 "required": True,
-                "keywords": ["entire agreement", "supersedes", "prior"]
+                "keywords": ["confidential", "proprietary", "trade secret"]
             },
-            "amendment": {
-                "template": "This Agreement may only be amended by a written instrument signed by both parties.",
+            "termination": {
+                "template": "Either party may terminate this Agreement by giving [X] days written notice. The Company may terminate immediately for cause including misconduct, breach of duties, or violation of company policies.",
                 "required": True,
-                "keywords": ["amendment", "modify", "written", "signed"]
+                "keywords": ["terminate", "termination", "notice period"]
             },
-            "severability": {
-                "template": "If any provision of this Agreement is held invalid or unenforceable, the remaining provisions shall continue in full force and effect.",
+            "non_compete": {
+                "template": "For a period of [X] months after termination, the Employee shall not engage in any business that directly competes with the Company within [geographic area].",
                 "required": False,
-                "keywords": ["severability", "invalid", "unenforceable", "remaining"]
+                "keywords": ["non-compete", "compete", "restriction"]
+            }
+        },
+        "Service Contract": {
+            "definitions": {
+                "template": "In this Agreement: 'Client' means [Client Name]; 'Service Provider' means [Provider Name]; 'Services' means the services described in Schedule A; 'Deliverables' means the work products to be delivered.",
+                "required": True,
+                "keywords": ["definitions", "client", "service provider", "services"]
+            },
+            "scope_of_services": {
+                "template": "The Service Provider shall provide the Services as described in Schedule A attached hereto. Any changes to the scope shall be agreed in writing by both parties.",
+                "required": True,
+                "keywords": ["scope", "services", "schedule", "deliverables"]
+            },
+            "payment_terms": {
+                "template": "The Client shall pay the Service Provider [Amount] for the Services. Payment shall be made within [X] days of receipt of invoice. Late payments shall attract interest at [Y]% per annum.",
+                "required": True,
+                "keywords": ["payment", "invoice", "fees", "compensation"]
+            },
+            "timeline": {
+                "template": "The Services shall be completed within [X] days/months from the Effective Date. Milestones and deadlines are set forth in Schedule B.",
+                "required": True,
+                "keywords": ["timeline", "deadline", "milestone", "completion"]
+            },
+            "warranties": {
+                "template": "The Service Provider warrants that the Services shall be performed in a professional and workmanlike manner in accordance with industry standards.",
+                "required": True,
+                "keywords": ["warranty", "warrants", "professional", "standards"]
+            },
+            "intellectual_property": {
+                "template": "All intellectual property created in the course of providing Services shall belong to [Party]. The other party is granted a [license type] license to use such IP.",
+                "required": True,
+                "keywords": ["intellectual property", "ip", "ownership", "license"]
+            },
+            "limitation_of_liability": {
+                "template": "The total liability of the Service Provider under this Agreement shall not exceed the total fees paid by the Client. Neither party shall be liable for indirect, consequential, or punitive damages.",
+                "required": True,
+                "keywords": ["liability", "limitation", "damages", "cap"]
+            },
+            "termination": {
+                "template": "Either party may terminate this Agreement with [X] days written notice. Upon termination, the Client shall pay for all Services rendered up to the termination date.",
+                "required": True,
+                "keywords": ["terminate", "termination", "notice"]
+            }
+        },
+        "Non-Disclosure Agreement": {
+            "definitions": {
+                "template": "'Confidential Information' means any information disclosed by the Disclosing Party to the Receiving Party, whether orally, in writing, or by inspection, that is designated as confidential or would reasonably be understood to be confidential.",
+                "required": True,
+                "keywords": ["confidential information", "disclosing party", "receiving party"]
+            },
+            "obligations": {
+                "template": "The Receiving Party shall: (a) maintain the confidentiality of the Confidential Information; (b) not disclose it to any third party without prior written consent; (c) use it only for the Purpose.",
+                "required": True,
+                "keywords": ["maintain", "not disclose", "third party", "purpose"]
+            },
+            "exclusions": {
+                "template": "Confidential Information does not include information that: (a) is publicly available; (b) was known to the Receiving Party prior to disclosure; (c) is independently developed; (d) is disclosed by a third party without breach.",
+                "required": True,
+                "keywords": ["exclude", "publicly available", "independently developed"]
+            },
+            "term": {
+                "template": "This Agreement shall remain in effect for [X] years from the Effective Date. The confidentiality obligations shall survive termination for [Y] years.",
+                "required": True,
+                "keywords": ["term", "years", "survive", "termination"]
             },
-            "notices": {
-                "template": "All notices under this Agreement shall be in writing and delivered to the addresses specified herein or such other address as may be notified.",
+            "return_of_information": {
+                "template": "Upon termination or request, the Receiving Party shall promptly return or destroy all Confidential Information and certify such destruction in writing.",
                 "required": True,
-                "keywords": ["notice", "notices", "writing", "address"]
+                "keywords": ["return", "destroy", "certify"]
+            }
+        },
+        "Lease Agreement": {
+            "premises": {
+                "template": "The Lessor hereby leases to the Lessee the premises located at [Address], comprising [description of premises] for the purpose of [permitted use].",
+                "required": True,
+                "keywords": ["premises", "located at", "address", "property"]
+            },
+            "term": {
+                "template": "The lease shall commence on [Start Date] and continue for a period of [X] months/years, unless terminated earlier in accordance with this Agreement.",
+                "required": True,
+                "keywords": ["term", "commence", "period", "months", "years"]
+            },
+            "rent": {
+                "template": "The Lessee shall pay a monthly rent of INR [Amount], payable on or before the [X]th day of each month. Rent shall be paid by [payment method].",
+                "required": True,
+                "keywords": ["rent", "monthly", "payable", "payment"]
+            },
+            "security_deposit": {
+                "template": "The Lessee shall pay a security deposit of INR [Amount] upon execution of this Agreement. The deposit shall be refunded within [X] days of termination, less any deductions for damages.",
+                "required": True,
+                "keywords": ["security deposit", "deposit", "refund"]
+            },
+            "maintenance": {
+                "template": "The Lessee shall maintain the premises in good condition. The Lessor shall be responsible for structural repairs and major maintenance.",
+                "required": True,
+                "keywords": ["maintenance", "repair", "condition"]
+            },
+            "termination": {
+                "template": "Either party may terminate this lease by giving [X] months written notice. Early termination by the Lessee may result in forfeiture of the security deposit.",
+                "required": True,
+                "keywords": ["terminate", "termination", "notice", "early termination"]
             }
         }
+    }
+    
+    # Standard clauses that should be in most contracts
+    universal_clauses = {
+        "governing_law": {
+            "template": "This Agreement shall be governed by and construed in accordance with the laws of India. The courts of [City] shall have exclusive jurisdiction.",
+            "required": True,
+            "keywords": ["governing law", "jurisdiction", "courts", "laws of india"]
+        },
+        "dispute_resolution": {
+            "template": "Any dispute arising out of this Agreement shall first be attempted to be resolved through mutual negotiation. If unresolved, the dispute shall be referred to arbitration/mediation.",
+            "required": True,
+            "keywords": ["dispute", "resolution", "arbitration", "mediation", "negotiation"]
+        },
+        "entire_agreement": {
+            "template": "This Agreement constitutes the entire agreement between the parties and supersedes all prior negotiations, representations, and agreements.",
+            "required": True,
+            "keywords": ["entire agreement", "supersedes", "prior"]
+        },
+        "amendment": {
+            "template": "This Agreement may only be amended by a written instrument signed by both parties.",
+            "required": True,
+            "keywords": ["amendment", "modify", "written", "signed"]
+        },
+        "severability": {
+            "template": "If any provision of this Agreement is held invalid or unenforceable, the remaining provisions shall continue in full force and effect.",
+            "required": False,
+            "keywords": ["severability", "invalid", "unenforceable", "remaining"]
+        },
+        "notices": {
+            "template": "All notices under this Agreement shall be in writing and delivered to the addresses specified herein or such other address as may be notified.",
+            "required": True,
+            "keywords": ["notice", "notices", "writing", "address"]
+        }
+    }
+    
+    # Normalize the templates once so comparisons never repeat this work.
+    # Each distinct keyword is also assigned a bit so keyword presence can
+    # be tracked as integer bitmaps. Keywords and tokens are interned so
+    # the many repeats across templates share one string object.
+    keyword_bits = {}
+    all_infos = [info for templates in standard_templates.values()
+                 for info in templates.values()]
+    all_infos.extend(universal_clauses.values())
+    for info in all_infos:
+        info['keywords'] = tuple(sys.intern(kw.lower()) for kw in info['keywords'])
+        info['template_norm'] = _WHITESPACE_RE.sub(' ', info['template'].strip()).lower()
+        info['template_words'] = frozenset(map(sys.intern, info['template_norm'].split()))
+        info['template_tokens'] = frozenset(map(sys.intern, _TOKEN_RE.findall(info['template_norm'])))
+        info['important_terms'] = tuple(
+            t for t in _IMPORTANT_TERMS if t in info['template_words']
+        )
+        info['concerning_terms'] = tuple(
+            t for t in _CONCERNING_TERMS if t not in info['template_norm']
+        )
+        mask = 0
+        for kw in info['keywords']:
+            bit = keyword_bits.setdefault(kw, len(keyword_bits))
+            mask |= 1 << bit
+        info['keyword_mask'] = mask
+        # Keyword hits needed to pass the presence checks (at least one)
+        info['min_keywords'] = max(1, math.ceil(len(info['keywords']) * _MIN_KEYWORD_FRACTION))
+    
+    # Freeze everything so instances can share one copy safely
+    universal = MappingProxyType({
+        name: MappingProxyType(info) for name, info in universal_clauses.items()
+    })
+    standard = MappingProxyType({
+        contract_type: MappingProxyType({
+            name: MappingProxyType(info) for name, info in templates.items()
+        })
+        for contract_type, templates in standard_templates.items()
+    })
+    
+    # Flatten each contract type's templates (plus the universal clauses)
+    # so comparisons don't re-merge and re-walk the nested dicts
+    tables = MappingProxyType({
+        contract_type: _build_template_table({**templates, **universal})
+        for contract_type, templates in standard.items()
+    })
+    
+    return _TemplateData(
+        standard_templates=standard,
+        universal_clauses=universal,
+        keyword_bits=MappingProxyType(keyword_bits),
+        tables=tables,
+        universal_table=_build_template_table(universal)
+    )
+
+
+class SimilarityMatcher:
+    """
+    Compares contract clauses against standard templates.
+    Uses text similarity algorithms and pattern matching.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        # Worker threads for matching templates concurrently; None keeps
+        # matching sequential. Useful on free-threaded Python builds.
+        self.max_workers = max_workers
+        
+        # Standard clause templates (static data shared by all instances)
+        data = _build_templates()
+        self.standard_templates = data.standard_templates
+        self.universal_clauses = data.universal_clauses
+        self._keyword_bits = data.keyword_bits
+        self._template_tables = data.tables
+        self._universal_table = data.universal_table
     
     def compare_to_template(self, contract_text: str,
                             contract_type: str,
@@ -233,26 +402,55 @@ class SimilarityMatcher:
             clauses: Optional parsed clauses
             
         Returns:
-            TemplateComparisonReport with comparison results
+            TemplateComparisonReport with comparison results. Repeated
+            comparisons of the same text and type, from any matcher, return
+            a copy of the cached report.
         """
+        cache_key = (
+            hashlib.blake2b(contract_text.encode('utf-8'), digest_size=16).digest(),
+            contract_type
+        )
+        with _report_cache_lock:
+            cached = _report_cache.get(cache_key)
+            if cached is not None:
+                _report_cache.move_to_end(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        report = self._compare(contract_text, contract_type)
+        with _report_cache_lock:
+            _report_cache[cache_key] = copy.deepcopy(report)
+            if len(_report_cache) > _REPORT_CACHE_SIZE:
+                _report_cache.popitem(last=False)
+        return report
+    
+    def _compare(self, contract_text: str, contract_type: str) -> TemplateComparisonReport:
+        """Run the template comparison without consulting the report cache."""
         # Get applicable templates
-        type_templates = self.standard_templates.get(contract_type, {})
-        all_templates = {**type_templates, **self.universal_clauses}
+        table = self._template_tables.get(contract_type, self._universal_table)
         
         matched_clauses = []
         missing_clauses = []
         extra_clauses = []
         
         text_lower = contract_text.lower()
+        index = self._index_sentences(text_lower)
+        
+        # Find matching section in contract for each template clause.
+        # Templates are independent and only read the shared sentence index.
+        def match(template_info: Dict) -> Dict:
+            return self._find_matching_clause(index, template_info)
+        
+        if self.max_workers and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                match_results = list(executor.map(match, table.infos))
+        else:
+            match_results = [match(info) for info in table.infos]
         
         # Check each template clause
-        for clause_name, template_info in all_templates.items():
-            # Find matching section in contract
-            match_result = self._find_matching_clause(
-                text_lower, 
-                template_info['template'],
-                template_info['keywords']
-            )
+        for k, match_result in enumerate(match_results):
+            clause_name = table.names[k]
+            template_info = table.infos[k]
             
             if match_result['found']:
                 similarity = SimilarityResult(
@@ -269,8 +467,8 @@ class SimilarityMatcher:
                 )
                 matched_clauses.append(similarity)
             else:
-                if template_info['required']:
-                    missing_clauses.append(clause_name.replace('_', ' ').title())
+                if table.required[k]:
+                    missing_clauses.append(table.labels[k])
         
         # Calculate overall similarity
         if matched_clauses:
@@ -279,7 +477,7 @@ class SimilarityMatcher:
             overall_similarity = 0.0
         
         # Calculate quality score
-        required_count = sum(1 for t in all_templates.values() if t['required'])
+        required_count = table.required_count
         matched_required = sum(1 for m in matched_clauses 
                               if m.similarity_score > 0.3)
         quality_score = matched_required / required_count if required_count > 0 else 0
@@ -299,52 +497,112 @@ class SimilarityMatcher:
             recommendations=recommendations
         )
     
-    def _find_matching_clause(self, text: str, 
-                               template: str,
-                               keywords: List[str]) -> Dict:
+    def _index_sentences(self, text: str) -> _SentenceIndex:
         """
-        Find a matching clause in the contract text.
+        Split text into sentences and record the keywords and tokens of each.
+        
+        Each keyword is located with one scan of the text; hits are bucketed
+        into sentences by offset. Keywords and tokens never contain '.' or
+        ';', so every occurrence falls inside a single sentence and a
+        window's keywords and tokens are the union of its sentences'.
         
         Args:
             text: Contract text (lowercase)
-            template: Template clause text
-            keywords: Keywords to search for
+            
+        Returns:
+            _SentenceIndex shared by every template comparison
+        """
+        sentences = text.translate(_SENTENCE_SPLIT_TRANS).split('.')
+        
+        starts = []
+        offset = 0
+        for sentence in sentences:
+            starts.append(offset)
+            offset += len(sentence) + 1
+        
+        sentence_bits = [0] * len(sentences)
+        text_bits = 0
+        for kw, bit in self._keyword_bits.items():
+            pos = text.find(kw)
+            if pos < 0:
+                continue
+            flag = 1 << bit
+            text_bits |= flag
+            while pos >= 0:
+                idx = bisect_right(starts, pos) - 1
+                sentence_bits[idx] |= flag
+                # Later hits in the same sentence add nothing; resume at the next one
+                if idx + 1 >= len(starts):
+                    break
+                pos = text.find(kw, starts[idx + 1])
+        
+        # Interned tokens compare by identity against the template tokens
+        tokenize = _TOKEN_RE.findall
+        tokens = [frozenset(map(sys.intern, tokenize(sentence))) for sentence in sentences]
+        
+        # Any window of sentences i..j-1 is joined[offsets[i]:offsets[j] - 2]
+        offsets = [0]
+        for sentence in sentences:
+            offsets.append(offsets[-1] + len(sentence) + 2)
+        
+        return _SentenceIndex(sentences, sentence_bits, text_bits, tokens,
+                              '. '.join(sentences), offsets)
+    
+    def _find_matching_clause(self, index: _SentenceIndex,
+                               template_info: Dict) -> Dict:
+        """
+        Find a matching clause in the contract text.
+        
+        Args:
+            index: Sentence index of the contract text
+            template_info: Template clause entry with its precomputed
+                token set and keyword bitmap
             
         Returns:
             Dictionary with match results
         """
-        # First, check if keywords are present
-        keyword_matches = sum(1 for kw in keywords if kw.lower() in text)
-        keyword_ratio = keyword_matches / len(keywords) if keywords else 0
+        keyword_mask = template_info['keyword_mask']
+        min_keywords = template_info['min_keywords']
         
-        if keyword_ratio < 0.3:
+        # First, check if enough keywords are present anywhere
+        if (index.text_bits & keyword_mask).bit_count() < min_keywords:
             return {'found': False, 'score': 0, 'matched_text': '', 'differences': []}
         
-        # Find the section containing most keywords
-        sentences = re.split(r'[.;]', text)
-        best_match = ''
-        best_score = 0
+        sentence_bits = index.keyword_bits
+        sentence_tokens = index.tokens
+        
+        # Score sections as they are found and keep the first best-scoring
+        # one. The best score so far, starting at the acceptance threshold,
+        # is the floor a section must beat, so the scorer can skip the full
+        # comparison for anything that could not win or be accepted.
+        template_tokens = template_info['template_tokens']
+        best_window = None
+        best_score = _MIN_MATCH_SCORE
+        
+        n_sentences = len(index.sentences)
         
         # Look for consecutive sentences that match
-        for i in range(len(sentences)):
+        for i in range(n_sentences):
+            section_bits = 0
+            section_tokens = frozenset()
             # Take up to 5 consecutive sentences
-            for j in range(i + 1, min(i + 6, len(sentences) + 1)):
-                section = '. '.join(sentences[i:j])
+            for j in range(i + 1, min(i + 6, n_sentences + 1)):
+                section_bits |= sentence_bits[j - 1]
+                section_tokens |= sentence_tokens[j - 1]
                 
                 # Check keyword presence in this section
-                section_keywords = sum(1 for kw in keywords if kw.lower() in section)
-                if section_keywords < len(keywords) * 0.3:
+                if (section_bits & keyword_mask).bit_count() < min_keywords:
                     continue
                 
-                # Calculate similarity
-                score = self._calculate_similarity(section, template.lower())
-                
+                score = self._token_set_ratio(section_tokens, template_tokens, best_score)
                 if score > best_score:
                     best_score = score
-                    best_match = section
+                    best_window = (i, j)
         
-        if best_score > 0.2:
-            differences = self._identify_differences(best_match, template.lower())
+        if best_window is not None:
+            i, j = best_window
+            best_match = index.joined[index.offsets[i]:index.offsets[j] - 2]
+            differences = self._identify_differences(best_match, template_info)
             return {
                 'found': True,
                 'score': best_score,
@@ -354,57 +612,105 @@ class SimilarityMatcher:
         
         return {'found': False, 'score': 0, 'matched_text': '', 'differences': []}
     
-    def _calculate_similarity(self, text1: str, text2: str) -> float:
+    def _calculate_similarity(self, text1: str, text2: str,
+                              floor: float = 0.0) -> float:
         """
         Calculate similarity between two texts.
-        Uses SequenceMatcher for similarity scoring.
+        Uses a token-set ratio, so word order and repeated phrases
+        do not lower the score. Scores at or below floor may be
+        underestimated (see _token_set_ratio).
         """
-        # Normalize texts
-        text1 = re.sub(r'\s+', ' ', text1.strip())
-        text2 = re.sub(r'\s+', ' ', text2.strip())
+        return self._token_set_ratio(
+            frozenset(_TOKEN_RE.findall(text1.lower())),
+            frozenset(_TOKEN_RE.findall(text2.lower())),
+            floor
+        )
+    
+    @staticmethod
+    def _token_set_ratio(tokens1: frozenset, tokens2: frozenset,
+                         floor: float = 0.0) -> float:
+        """
+        Token-set ratio of two token sets.
+        
+        Shared tokens form a common sorted prefix and each side's remaining
+        tokens are appended to it; the score is the best ratio among the
+        prefix and the two combined strings. Because the prefix is common,
+        only the two leftover token strings need a SequenceMatcher pass.
+        
+        That pass is skipped when SequenceMatcher's cheap upper bounds
+        (real_quick_ratio, quick_ratio) show it cannot lift the score above
+        floor. The exact score is returned whenever it exceeds floor;
+        otherwise the result is some value no greater than floor.
+        """
+        if not tokens1 or not tokens2:
+            return 0.0
         
-        # Use SequenceMatcher
-        matcher = SequenceMatcher(None, text1, text2)
-        return matcher.ratio()
+        shared = tokens1 & tokens2
+        diff1 = ' '.join(sorted(tokens1 - tokens2))
+        diff2 = ' '.join(sorted(tokens2 - tokens1))
+        
+        if not shared:
+            matcher = SequenceMatcher(None, diff1, diff2)
+            for bound in (matcher.real_quick_ratio, matcher.quick_ratio):
+                upper = bound()
+                if upper <= floor:
+                    return upper
+            return matcher.ratio()
+        if not diff1 or not diff2:
+            # One side's tokens are a subset of the other's
+            return 1.0
+        
+        # Lengths of "shared" and "shared diff" as space-joined strings
+        shared_len = sum(map(len, shared)) + len(shared) - 1
+        len1 = shared_len + 1 + len(diff1)
+        len2 = shared_len + 1 + len(diff2)
+        
+        # Prefix-vs-combined ratios need no matching at all
+        score = max(
+            2 * shared_len / (shared_len + len1),
+            2 * shared_len / (shared_len + len2)
+        )
+        threshold = max(score, floor)
+        
+        # Combined-vs-combined ratio, from the characters matched between
+        # the two leftover strings
+        def combined_ratio(diff_matches: int) -> float:
+            return 2 * (shared_len + 1 + diff_matches) / (len1 + len2)
+        
+        diff_total = len(diff1) + len(diff2)
+        matcher = SequenceMatcher(None, diff1, diff2)
+        for bound in (matcher.real_quick_ratio, matcher.quick_ratio):
+            if combined_ratio(round(bound() * diff_total / 2)) <= threshold:
+                return score
+        
+        diff_matches = sum(block.size for block in matcher.get_matching_blocks())
+        return max(score, combined_ratio(diff_matches))
     
-    def _identify_differences(self, actual: str, template: str) -> List[str]:
+    def _identify_differences(self, actual: str, template_info: Dict) -> List[str]:
         """
         Identify key differences between actual and template.
+        
+        The template's word set and the candidate terms to check are
+        precomputed in __init__.
         """
         differences = []
         
         # Check for missing key elements
-        template_words = set(template.split())
-        actual_words = set(actual.split())
-        
-        # Important legal terms that might be missing
-        important_terms = ['shall', 'must', 'may', 'written', 'notice', 'days', 
-                          'liability', 'indemnify', 'terminate', 'confidential']
-        
-        for term in important_terms:
-            if term in template_words and term not in actual_words:
+        actual_words = frozenset(actual.split())
+        for term in template_info['important_terms']:
+            if term not in actual_words:
                 differences.append(f"Missing term: '{term}'")
         
         # Check for concerning additions
-        concerning_terms = ['unlimited', 'perpetual', 'irrevocable', 'sole discretion']
-        for term in concerning_terms:
-            if term in actual and term not in template:
+        for term in template_info['concerning_terms']:
+            if term in actual:
                 differences.append(f"Added concerning term: '{term}'")
         
         return differences[:5]
     
     def _score_to_match_type(self, score: float) -> str:
         """Convert similarity score to match type."""
-        if score >= 0.8:
-            return "exact"
-        elif score >= 0.6:
-            return "high"
-        elif score >= 0.4:
-            return "medium"
-        elif score >= 0.2:
-            return "low"
-        else:
-            return "no_match"
+        return _MATCH_TYPES[bisect_right(_MATCH_TYPE_BOUNDS, score)]
     
     def _generate_suggestions(self, clause_name: str,
                                score: float,
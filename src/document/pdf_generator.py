@@ -4,10 +4,199 @@ Generates professional PDF reports for contract analysis
 """
 
 import os
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, List, Optional
 from datetime import datetime
 from dataclasses import dataclass
 import io
+import math
+import json
+import hashlib
+import threading
+import functools
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from fpdf import FPDF
+    from fpdf.enums import XPos, YPos
+except ImportError:
+    # Only report generation needs fpdf2; the rest of the package works without it
+    FPDF = None
+
+
+# Report colors (RGB)
+_PRIMARY = (41, 128, 185)      # Blue
+_SECONDARY = (52, 73, 94)      # Dark gray
+_SUCCESS = (39, 174, 96)       # Green
+_WARNING = (241, 196, 15)      # Yellow
+_DANGER = (231, 76, 60)        # Red
+_LIGHT = (236, 240, 241)       # Light gray
+_WHITE = (255, 255, 255)
+_BLACK = (0, 0, 0)
+
+# Common Unicode characters the core PDF fonts cannot render, with the
+# ASCII text used in their place
+_SAFE_TEXT_REPLACEMENTS = {
+    '₹': 'Rs.',
+    '€': 'EUR',
+    '£': 'GBP',
+    '–': '-',
+    '—': '-',
+    '\u201c': '"',
+    '\u201d': '"',
+    '\u2018': "'",
+    '\u2019': "'",
+    '…': '...',
+    '•': '-',
+    '→': '->',
+    '←': '<-',
+    '✓': '[OK]',
+    '✗': '[X]',
+    '⚠': '[!]',
+    '⚡': '[!]',
+    '✅': '[OK]',
+    '❌': '[X]',
+}
+_SAFE_TEXT_ITEMS = tuple(_SAFE_TEXT_REPLACEMENTS.items())
+
+# Longer strings (summaries, long issues) rarely repeat and skip the cache
+_SAFE_TEXT_CACHE_MAX_LEN = 512
+
+
+@functools.lru_cache(maxsize=4096)
+def _to_latin1(text: str) -> str:
+    """Substitute ASCII for common Unicode characters and encode the rest as latin-1."""
+    # The membership test skips the copy for characters that are absent
+    for unicode_char, ascii_char in _SAFE_TEXT_ITEMS:
+        if unicode_char in text:
+            text = text.replace(unicode_char, ascii_char)
+    # Encode to latin-1 and replace any remaining problematic characters
+    return text.encode('latin-1', errors='replace').decode('latin-1')
+
+
+def _safe_text(text) -> str:
+    """
+    Convert text to ASCII-safe format for PDF.
+    
+    Conversions of non-ASCII labels and entity values, which recur across
+    a report and across reports, are cached.
+    """
+    if not text:
+        return ""
+    result = text if isinstance(text, str) else str(text)
+    # Plain ASCII needs no replacements and is already latin-1
+    if result.isascii():
+        return result
+    if len(result) > _SAFE_TEXT_CACHE_MAX_LEN:
+        return _to_latin1.__wrapped__(result)
+    return _to_latin1(result)
+
+
+if FPDF is not None:
+    class _ReportPDF(FPDF):
+        """FPDF document that draws the report header and footer on every page."""
+        
+        # Title shown in the header bar; set before add_page() starts a section
+        section_title = ''
+        header_margin = 20
+        # Timestamp shared by every page of the report, set when it is created
+        generated_at = ''
+        
+        def header(self):
+            # Background bar
+            self.set_fill_color(*_PRIMARY)
+            self.rect(0, 0, self.w, 40, 'F')
+            
+            # Title
+            self.set_text_color(*_WHITE)
+            self.set_font('Helvetica', 'B', 20)
+            self.set_xy(self.header_margin, 12)
+            self.cell(0, 10, _safe_text(self.section_title), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            
+            # Subtitle
+            self.set_font('Helvetica', '', 10)
+            self.set_xy(self.header_margin, 25)
+            self.cell(0, 10, f"Generated: {self.generated_at}")
+            
+            # Reset position and color
+            self.set_text_color(*_BLACK)
+            self.set_xy(self.header_margin, 50)
+        
+        def footer(self):
+            self.set_y(-15)
+            self.set_font('Helvetica', 'I', 8)
+            self.set_text_color(*_SECONDARY)
+            # {nb} is replaced with the total page count when the PDF is output
+            self.cell(0, 10, f'Page {self.page_no()} of {{nb}} | Contract Analysis Bot | Confidential', align='C')
+
+
+def _truncate(value, limit: int) -> str:
+    """Convert value to str once and cut it to at most limit characters."""
+    text = value if isinstance(value, str) else str(value)
+    return text if len(text) <= limit else text[:limit]
+
+
+# Number of generated reports kept for repeated requests with the same inputs
+_REPORT_CACHE_SIZE = 64
+
+# Shared by all generator instances; keyed by BLAKE2b of the method name and
+# its JSON-serialized arguments
+_report_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+def _cached_report(method):
+    """
+    Cache a generate_*_report method's PDF by its inputs.
+    
+    Reports written to out are streamed and never cached. Otherwise an
+    immutable bytes copy is cached, the caller that rendered the report
+    keeps the buffer, and repeat requests share the cached bytes. Calls with
+    arguments that JSON cannot encode are never cached: a default str()
+    includes the object's address, which a different object may reuse. A
+    cached report keeps the "Generated" time of its first rendering.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, out: Optional[BinaryIO] = None, **kwargs):
+        if out is not None:
+            return method(self, *args, out=out, **kwargs)
+        
+        try:
+            payload = json.dumps([method.__name__, args, kwargs], sort_keys=True)
+        except (TypeError, ValueError):
+            return method(self, *args, **kwargs)
+        key = hashlib.blake2b(payload.encode('utf-8'), digest_size=16).digest()
+        
+        with _report_cache_lock:
+            content = _report_cache.get(key)
+            if content is not None:
+                _report_cache.move_to_end(key)
+        if content is not None:
+            return content
+        
+        content = method(self, *args, **kwargs)
+        with _report_cache_lock:
+            _report_cache[key] = bytes(content)
+            if len(_report_cache) > _REPORT_CACHE_SIZE:
+                _report_cache.popitem(last=False)
+        return content
+    
+    return wrapper
+
+
+# generate_reports_bulk job types and the generator method each one calls
+_REPORT_METHODS = {
+    'analysis': 'generate_analysis_report',
+    'summary': 'generate_summary_report',
+    'clause': 'generate_clause_report',
+}
+
+
+def _render_one(job: Dict) -> bytes:
+    """Render one bulk report job (module-level so it can run in a worker process)."""
+    kwargs = dict(job)
+    method = _REPORT_METHODS[kwargs.pop('report_type')]
+    return getattr(PDFReportGenerator(), method)(**kwargs)
 
 
 @dataclass
@@ -30,49 +219,21 @@ class PDFReportGenerator:
         self.margin = 20
         self.content_width = self.page_width - (2 * self.margin)
         
-        # Colors
+        # Colors (the methods use the module constants directly)
         self.colors = {
-            'primary': (41, 128, 185),      # Blue
-            'secondary': (52, 73, 94),       # Dark gray
-            'success': (39, 174, 96),        # Green
-            'warning': (241, 196, 15),       # Yellow
-            'danger': (231, 76, 60),         # Red
-            'light': (236, 240, 241),        # Light gray
-            'white': (255, 255, 255),
-            'black': (0, 0, 0)
+            'primary': _PRIMARY,
+            'secondary': _SECONDARY,
+            'success': _SUCCESS,
+            'warning': _WARNING,
+            'danger': _DANGER,
+            'light': _LIGHT,
+            'white': _WHITE,
+            'black': _BLACK
         }
     
     def _safe_text(self, text: str) -> str:
         """Convert text to ASCII-safe format for PDF."""
-        if not text:
-            return ""
-        # Replace common Unicode characters with ASCII equivalents
-        replacements = {
-            '₹': 'Rs.',
-            '€': 'EUR',
-            '£': 'GBP',
-            '–': '-',
-            '—': '-',
-            '"': '"',
-            '"': '"',
-            ''': "'",
-            ''': "'",
-            '…': '...',
-            '•': '-',
-            '→': '->',
-            '←': '<-',
-            '✓': '[OK]',
-            '✗': '[X]',
-            '⚠': '[!]',
-            '⚡': '[!]',
-            '✅': '[OK]',
-            '❌': '[X]',
-        }
-        result = str(text)
-        for unicode_char, ascii_char in replacements.items():
-            result = result.replace(unicode_char, ascii_char)
-        # Encode to latin-1 and replace any remaining problematic characters
-        return result.encode('latin-1', errors='replace').decode('latin-1')
+        return _safe_text(text)
     
     def generate_analysis_report(self, 
                                   contract_info: Dict,
@@ -81,7 +242,8 @@ class PDFReportGenerator:
                                   compliance: Dict,
                                   entities: Dict,
                                   summary: str,
-                                  recommendations: List[str]) -> bytes:
+                                  recommendations: List[str],
+                                  *, out: Optional[BinaryIO] = None) -> Optional[bytes]:
         """
         Generate a comprehensive analysis report.
         
@@ -93,18 +255,15 @@ class PDFReportGenerator:
             entities: Extracted entities
             summary: Contract summary
             recommendations: List of recommendations
+            out: Binary stream to write the PDF to instead of returning it
             
         Returns:
-            PDF content as bytes
+            PDF content as bytes, or None if written to out
         """
-        from fpdf import FPDF
-        
-        pdf = FPDF()
-        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf = self._new_pdf()
         
         # Add first page with header
-        pdf.add_page()
-        self._add_header(pdf, contract_info.get('filename', 'Contract Analysis Report'))
+        self._add_page(pdf, contract_info.get('filename', 'Contract Analysis Report'))
         
         # Executive Summary
         self._add_section_title(pdf, "Executive Summary")
@@ -115,36 +274,31 @@ class PDFReportGenerator:
         self._add_classification_section(pdf, classification)
         
         # Risk Assessment
-        pdf.add_page()
-        self._add_header(pdf, "Risk Assessment")
+        self._add_page(pdf, "Risk Assessment")
         self._add_risk_section(pdf, risk_analysis)
         
         # Compliance Status
-        pdf.add_page()
-        self._add_header(pdf, "Compliance Check")
+        self._add_page(pdf, "Compliance Check")
         self._add_compliance_section(pdf, compliance)
         
         # Key Entities
-        pdf.add_page()
-        self._add_header(pdf, "Extracted Information")
+        self._add_page(pdf, "Extracted Information")
         self._add_entities_section(pdf, entities)
         
         # Recommendations
-        pdf.add_page()
-        self._add_header(pdf, "Recommendations")
+        self._add_page(pdf, "Recommendations")
         self._add_recommendations_section(pdf, recommendations)
         
-        # Footer with timestamp
-        self._add_footer(pdf)
-        
-        return pdf.output()
+        return self._output(pdf, out)
     
+    @_cached_report
     def generate_summary_report(self,
                                  contract_info: Dict,
                                  summary: str,
                                  key_points: List[str],
                                  risk_level: str,
-                                 risk_score: float) -> bytes:
+                                 risk_score: float,
+                                 *, out: Optional[BinaryIO] = None) -> Optional[bytes]:
         """
         Generate a brief summary report.
         
@@ -154,23 +308,20 @@ class PDFReportGenerator:
             key_points: Key points from analysis
             risk_level: Overall risk level
             risk_score: Overall risk score
+            out: Binary stream to write the PDF to instead of returning it
             
         Returns:
-            PDF content as bytes
+            PDF content as bytes, or None if written to out
         """
-        from fpdf import FPDF
-        
-        pdf = FPDF()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.add_page()
+        pdf = self._new_pdf()
         
         # Header
-        self._add_header(pdf, "Contract Summary Report")
+        self._add_page(pdf, "Contract Summary Report")
         
         # Contract Info
-        pdf.set_font('Helvetica', 'B', 12)
-        pdf.cell(0, 10, f"Document: {contract_info.get('filename', 'Unknown')}", ln=True)
-        pdf.cell(0, 10, f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}", ln=True)
+        self._set_font(pdf, 'B', 12)
+        pdf.cell(0, 10, f"Document: {contract_info.get('filename', 'Unknown')}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.cell(0, 10, f"Date: {pdf.generated_at[:16]}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         pdf.ln(5)
         
         # Risk Indicator
@@ -185,88 +336,125 @@ class PDFReportGenerator:
         if key_points:
             self._add_section_title(pdf, "Key Points")
             for point in key_points[:10]:
-                pdf.set_font('Helvetica', '', 10)
-                pdf.multi_cell(self.content_width, 6, self._safe_text(f"- {str(point)[:150]}"))
+                self._set_font(pdf, '', 10)
+                self._fit_cell(pdf, self._safe_text(f"- {_truncate(point, 150)}"))
         
-        self._add_footer(pdf)
+        return self._output(pdf, out)
+    
+    def _new_pdf(self) -> "FPDF":
+        """Create a report document; the header and footer are added to every page."""
+        if FPDF is None:
+            raise ImportError("PDF reports require fpdf2: pip install fpdf2")
+        pdf = _ReportPDF()
+        pdf.header_margin = self.margin
+        pdf.generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        pdf.set_compression(True)
+        pdf.alias_nb_pages()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        return pdf
+    
+    @classmethod
+    def generate_reports_bulk(cls, jobs: List[Dict],
+                              workers: Optional[int] = None) -> List[bytes]:
+        """
+        Generate many reports in parallel worker processes.
         
+        Args:
+            jobs: Dicts with a 'report_type' ('analysis', 'summary' or 'clause')
+                plus the keyword arguments of the matching generate_*_report
+            workers: Number of worker processes (defaults to the CPU count)
+            
+        Returns:
+            PDF content as bytes for each job, in input order
+        """
+        workers = min(workers or os.cpu_count() or 1, len(jobs))
+        if workers <= 1:
+            return [_render_one(job) for job in jobs]
+        
+        # Send jobs in small chunks to amortize pickling without idling workers
+        chunksize = max(1, min(4, len(jobs) // workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_render_one, jobs, chunksize=chunksize))
+    
+    def _output(self, pdf, out: Optional[BinaryIO]) -> Optional[bytes]:
+        """Return the finished PDF, or write it to out without keeping a copy."""
+        if out is not None:
+            pdf.output(out)
+            return None
         return pdf.output()
     
-    def _add_header(self, pdf, title: str):
-        """Add report header."""
-        # Background bar
-        pdf.set_fill_color(*self.colors['primary'])
-        pdf.rect(0, 0, self.page_width, 40, 'F')
-        
-        # Title
-        pdf.set_text_color(*self.colors['white'])
-        pdf.set_font('Helvetica', 'B', 20)
-        pdf.set_xy(self.margin, 12)
-        pdf.cell(0, 10, title, ln=True)
-        
-        # Subtitle
-        pdf.set_font('Helvetica', '', 10)
-        pdf.set_xy(self.margin, 25)
-        pdf.cell(0, 10, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        # Reset position and color
-        pdf.set_text_color(*self.colors['black'])
-        pdf.set_xy(self.margin, 50)
+    def _add_page(self, pdf, title: str):
+        """Start a new page whose header shows title; pages added by automatic breaks repeat it."""
+        pdf.section_title = title
+        pdf.add_page()
+    
+    def _set_font(self, pdf, style: str, size: float):
+        """Set a Helvetica font unless it is already current (skips fpdf2's argument handling)."""
+        if pdf.font_family == 'helvetica' and pdf.font_style == style and pdf.font_size_pt == size:
+            return
+        pdf.set_font('Helvetica', style, size)
     
     def _add_section_title(self, pdf, title: str):
         """Add a section title."""
         pdf.ln(5)
-        pdf.set_font('Helvetica', 'B', 14)
-        pdf.set_text_color(*self.colors['primary'])
-        pdf.cell(0, 10, title, ln=True)
-        pdf.set_text_color(*self.colors['black'])
+        self._set_font(pdf, 'B', 14)
+        pdf.set_text_color(*_PRIMARY)
+        pdf.cell(0, 10, title, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.set_text_color(*_BLACK)
         
         # Underline
-        pdf.set_draw_color(*self.colors['primary'])
+        pdf.set_draw_color(*_PRIMARY)
         pdf.line(self.margin, pdf.get_y(), self.page_width - self.margin, pdf.get_y())
         pdf.ln(5)
     
     def _add_text(self, pdf, text: str):
         """Add paragraph text."""
-        pdf.set_font('Helvetica', '', 10)
+        self._set_font(pdf, '', 10)
         # Ensure text is safe for PDF
         safe_text = str(text).encode('latin-1', errors='replace').decode('latin-1')
         pdf.multi_cell(self.content_width, 6, safe_text)
         pdf.ln(3)
     
+    def _fit_cell(self, pdf, text: str, h: float = 6):
+        """Write a line of text, wrapping with multi_cell only when it does not fit."""
+        if '\n' not in text and pdf.get_string_width(text) <= self.content_width - 2 * pdf.c_margin:
+            pdf.cell(self.content_width, h, text, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        else:
+            pdf.multi_cell(self.content_width, h, text, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    
     def _add_classification_section(self, pdf, classification: Dict):
         """Add contract classification section."""
-        pdf.set_font('Helvetica', '', 11)
+        self._set_font(pdf, '', 11)
         
         # Contract Type
         contract_type = classification.get('contract_type', 'Unknown')
         confidence = classification.get('confidence', 0)
         
-        pdf.set_font('Helvetica', 'B', 11)
+        self._set_font(pdf, 'B', 11)
         pdf.cell(50, 8, "Contract Type:")
-        pdf.set_font('Helvetica', '', 11)
-        pdf.cell(0, 8, contract_type, ln=True)
+        self._set_font(pdf, '', 11)
+        pdf.cell(0, 8, contract_type, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         
-        pdf.set_font('Helvetica', 'B', 11)
+        self._set_font(pdf, 'B', 11)
         pdf.cell(50, 8, "Confidence:")
-        pdf.set_font('Helvetica', '', 11)
-        pdf.cell(0, 8, f"{confidence:.0%}", ln=True)
+        self._set_font(pdf, '', 11)
+        pdf.cell(0, 8, f"{confidence:.0%}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         
         # Parties
         parties = classification.get('parties', [])
         if parties:
-            pdf.set_font('Helvetica', 'B', 11)
+            self._set_font(pdf, 'B', 11)
             pdf.cell(50, 8, "Parties:")
-            pdf.set_font('Helvetica', '', 11)
+            self._set_font(pdf, '', 11)
             pdf.multi_cell(0, 8, ', '.join(parties[:5]))
         
         # Jurisdiction
         jurisdiction = classification.get('jurisdiction', '')
         if jurisdiction:
-            pdf.set_font('Helvetica', 'B', 11)
+            self._set_font(pdf, 'B', 11)
             pdf.cell(50, 8, "Jurisdiction:")
-            pdf.set_font('Helvetica', '', 11)
-            pdf.cell(0, 8, jurisdiction, ln=True)
+            self._set_font(pdf, '', 11)
+            pdf.cell(0, 8, jurisdiction, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
     
     def _add_risk_section(self, pdf, risk_analysis: Dict):
         """Add risk analysis section."""
@@ -280,32 +468,32 @@ class PDFReportGenerator:
         # Risk Distribution
         distribution = risk_analysis.get('risk_distribution', {})
         if distribution:
-            pdf.set_font('Helvetica', 'B', 11)
-            pdf.cell(0, 8, "Risk Distribution:", ln=True)
-            pdf.set_font('Helvetica', '', 10)
+            self._set_font(pdf, 'B', 11)
+            pdf.cell(0, 8, "Risk Distribution:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            self._set_font(pdf, '', 10)
             
             for level, count in distribution.items():
                 color = self._get_risk_color(level)
                 pdf.set_text_color(*color)
-                pdf.cell(0, 6, f"  - {level.upper()}: {count} clauses", ln=True)
+                pdf.cell(0, 6, f"  - {level.upper()}: {count} clauses", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             
-            pdf.set_text_color(*self.colors['black'])
+            pdf.set_text_color(*_BLACK)
         
         # Priority Issues
         priority_issues = risk_analysis.get('priority_issues', [])
         if priority_issues:
             pdf.ln(5)
-            pdf.set_font('Helvetica', 'B', 11)
-            pdf.cell(0, 8, "Priority Issues:", ln=True)
-            pdf.set_font('Helvetica', '', 10)
+            self._set_font(pdf, 'B', 11)
+            pdf.cell(0, 8, "Priority Issues:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            self._set_font(pdf, '', 10)
             
             for issue in priority_issues[:5]:
-                pdf.set_text_color(*self.colors['danger'])
+                pdf.set_text_color(*_DANGER)
                 # Truncate long issues to prevent overflow
-                issue_text = str(issue)[:150] if len(str(issue)) > 150 else str(issue)
-                pdf.multi_cell(self.content_width, 6, self._safe_text(f"[!] {issue_text}"))
+                issue_text = _truncate(issue, 150)
+                self._fit_cell(pdf, self._safe_text(f"[!] {issue_text}"))
             
-            pdf.set_text_color(*self.colors['black'])
+            pdf.set_text_color(*_BLACK)
     
     def _add_risk_indicator(self, pdf, risk_level: str, risk_score: float):
         """Add visual risk indicator."""
@@ -319,8 +507,8 @@ class PDFReportGenerator:
         
         # Risk box
         pdf.set_fill_color(*color)
-        pdf.set_text_color(*self.colors['white'])
-        pdf.set_font('Helvetica', 'B', 12)
+        pdf.set_text_color(*_WHITE)
+        self._set_font(pdf, 'B', 12)
         
         # Draw box
         box_width = 80
@@ -330,12 +518,12 @@ class PDFReportGenerator:
         
         pdf.rect(x, y, box_width, box_height, 'F')
         pdf.set_xy(x, y + 5)
-        pdf.cell(box_width, 8, f"RISK: {level_str.upper()}", align='C', ln=True)
+        pdf.cell(box_width, 8, f"RISK: {level_str.upper()}", align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         pdf.set_xy(x, y + 15)
-        pdf.set_font('Helvetica', '', 10)
+        self._set_font(pdf, '', 10)
         pdf.cell(box_width, 6, f"Score: {risk_score:.2f}", align='C')
         
-        pdf.set_text_color(*self.colors['black'])
+        pdf.set_text_color(*_BLACK)
         pdf.set_xy(self.margin, y + box_height + 5)
     
     def _add_compliance_section(self, pdf, compliance: Dict):
@@ -346,182 +534,176 @@ class PDFReportGenerator:
         
         # Status indicator
         if status == 'compliant':
-            color = self.colors['success']
+            color = _SUCCESS
             icon = "[OK]"
         elif status == 'partially_compliant':
-            color = self.colors['warning']
+            color = _WARNING
             icon = "[!]"
         else:
-            color = self.colors['danger']
+            color = _DANGER
             icon = "[X]"
         
         pdf.set_text_color(*color)
-        pdf.set_font('Helvetica', 'B', 14)
-        pdf.cell(0, 10, f"{icon} Status: {status.upper().replace('_', ' ')}", ln=True)
-        pdf.set_text_color(*self.colors['black'])
+        self._set_font(pdf, 'B', 14)
+        pdf.cell(0, 10, f"{icon} Status: {status.upper().replace('_', ' ')}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.set_text_color(*_BLACK)
         
         # Laws Checked
         laws = compliance.get('laws_checked', [])
         if laws:
             pdf.ln(5)
-            pdf.set_font('Helvetica', 'B', 11)
-            pdf.cell(0, 8, "Laws Checked:", ln=True)
-            pdf.set_font('Helvetica', '', 10)
-            for law in laws:
-                pdf.cell(0, 6, f"  - {law}", ln=True)
+            self._set_font(pdf, 'B', 11)
+            pdf.cell(0, 8, "Laws Checked:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            self._set_font(pdf, '', 10)
+            pdf.multi_cell(0, 6, self._safe_text('\n'.join(f"  - {law}" for law in laws)))
         
         # Issues
         issues = compliance.get('issues', [])
         if issues:
             pdf.ln(5)
-            pdf.set_font('Helvetica', 'B', 11)
-            pdf.set_text_color(*self.colors['danger'])
-            pdf.cell(0, 8, f"Issues Found ({len(issues)}):", ln=True)
-            pdf.set_text_color(*self.colors['black'])
-            pdf.set_font('Helvetica', '', 10)
+            self._set_font(pdf, 'B', 11)
+            pdf.set_text_color(*_DANGER)
+            pdf.cell(0, 8, f"Issues Found ({len(issues)}):", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            pdf.set_text_color(*_BLACK)
+            self._set_font(pdf, '', 10)
             
             for issue in issues[:5]:
                 if hasattr(issue, 'law_reference'):
-                    text = f"- [{issue.law_reference}] {issue.issue_description}"[:150]
-                    pdf.multi_cell(self.content_width, 6, self._safe_text(text))
+                    text = _truncate(f"- [{issue.law_reference}] {issue.issue_description}", 150)
+                    self._fit_cell(pdf, self._safe_text(text))
                 else:
-                    pdf.multi_cell(self.content_width, 6, self._safe_text(f"- {str(issue)[:150]}"))
+                    self._fit_cell(pdf, self._safe_text(f"- {_truncate(issue, 150)}"))
     
     def _add_entities_section(self, pdf, entities: Dict):
         """Add extracted entities section."""
         # Parties
         parties = entities.get('parties', [])
         if parties:
-            pdf.set_font('Helvetica', 'B', 11)
-            pdf.cell(0, 8, "Parties Identified:", ln=True)
-            pdf.set_font('Helvetica', '', 10)
-            for party in parties[:5]:
-                val = party.value if hasattr(party, 'value') else str(party)
-                pdf.cell(0, 6, self._safe_text(f"  - {val}"), ln=True)
+            self._set_font(pdf, 'B', 11)
+            pdf.cell(0, 8, "Parties Identified:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            self._set_font(pdf, '', 10)
+            lines = '\n'.join(f"  - {val}" for val in self._extract_values(parties, 5))
+            pdf.multi_cell(0, 6, self._safe_text(lines))
             pdf.ln(3)
         
         # Dates
         dates = entities.get('dates', [])
         if dates:
-            pdf.set_font('Helvetica', 'B', 11)
-            pdf.cell(0, 8, "Key Dates:", ln=True)
-            pdf.set_font('Helvetica', '', 10)
-            for date in dates[:5]:
-                val = date.value if hasattr(date, 'value') else str(date)
-                pdf.cell(0, 6, self._safe_text(f"  - {val}"), ln=True)
+            self._set_font(pdf, 'B', 11)
+            pdf.cell(0, 8, "Key Dates:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            self._set_font(pdf, '', 10)
+            lines = '\n'.join(f"  - {val}" for val in self._extract_values(dates, 5))
+            pdf.multi_cell(0, 6, self._safe_text(lines))
             pdf.ln(3)
         
         # Amounts
         amounts = entities.get('amounts', [])
         if amounts:
-            pdf.set_font('Helvetica', 'B', 11)
-            pdf.cell(0, 8, "Financial Amounts:", ln=True)
-            pdf.set_font('Helvetica', '', 10)
-            for amount in amounts[:5]:
-                val = amount.value if hasattr(amount, 'value') else str(amount)
-                pdf.cell(0, 6, self._safe_text(f"  - {val}"), ln=True)
+            self._set_font(pdf, 'B', 11)
+            pdf.cell(0, 8, "Financial Amounts:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            self._set_font(pdf, '', 10)
+            lines = '\n'.join(f"  - {val}" for val in self._extract_values(amounts, 5))
+            pdf.multi_cell(0, 6, self._safe_text(lines))
             pdf.ln(3)
         
         # Jurisdictions
         jurisdictions = entities.get('jurisdictions', [])
         if jurisdictions:
-            pdf.set_font('Helvetica', 'B', 11)
-            pdf.cell(0, 8, "Jurisdiction:", ln=True)
-            pdf.set_font('Helvetica', '', 10)
-            for j in jurisdictions[:3]:
-                val = j.value if hasattr(j, 'value') else str(j)
-                pdf.cell(0, 6, self._safe_text(f"  - {val}"), ln=True)
+            self._set_font(pdf, 'B', 11)
+            pdf.cell(0, 8, "Jurisdiction:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            self._set_font(pdf, '', 10)
+            lines = '\n'.join(f"  - {val}" for val in self._extract_values(jurisdictions, 3))
+            pdf.multi_cell(0, 6, self._safe_text(lines))
+    
+    @staticmethod
+    def _extract_values(items: List, limit: int) -> List:
+        """Return up to limit display values (an entity's .value, else the item itself)."""
+        return [getattr(item, 'value', item) for item in items[:limit]]
     
     def _add_recommendations_section(self, pdf, recommendations: List[str]):
         """Add recommendations section."""
         if not recommendations:
-            pdf.set_font('Helvetica', '', 11)
-            pdf.cell(0, 10, "No specific recommendations at this time.", ln=True)
+            self._set_font(pdf, '', 11)
+            pdf.cell(0, 10, "No specific recommendations at this time.", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             return
         
-        pdf.set_font('Helvetica', '', 10)
+        self._set_font(pdf, '', 10)
         
         for i, rec in enumerate(recommendations, 1):
             # Check for priority indicators
             if 'CRITICAL' in rec or 'HIGH RISK' in rec:
-                pdf.set_text_color(*self.colors['danger'])
+                pdf.set_text_color(*_DANGER)
             elif 'HIGH' in rec or 'MODERATE' in rec:
-                pdf.set_text_color(*self.colors['warning'])
+                pdf.set_text_color(*_WARNING)
             elif 'LOW' in rec or 'appears' in rec:
-                pdf.set_text_color(*self.colors['success'])
+                pdf.set_text_color(*_SUCCESS)
             else:
-                pdf.set_text_color(*self.colors['black'])
+                pdf.set_text_color(*_BLACK)
             
-            rec_text = str(rec)[:200] if len(str(rec)) > 200 else str(rec)
-            pdf.multi_cell(self.content_width, 6, self._safe_text(f"{i}. {rec_text}"))
+            rec_text = _truncate(rec, 200)
+            self._fit_cell(pdf, self._safe_text(f"{i}. {rec_text}"))
             pdf.ln(2)
         
-        pdf.set_text_color(*self.colors['black'])
-    
-    def _add_footer(self, pdf):
-        """Add footer to all pages."""
-        total_pages = pdf.page_no()
-        
-        for page in range(1, total_pages + 1):
-            pdf.page = page
-            pdf.set_y(-15)
-            pdf.set_font('Helvetica', 'I', 8)
-            pdf.set_text_color(*self.colors['secondary'])
-            pdf.cell(0, 10, f'Page {page} of {total_pages} | Contract Analysis Bot | Confidential', align='C')
+        pdf.set_text_color(*_BLACK)
     
     def _get_risk_color(self, level: str) -> tuple:
         """Get color for risk level."""
         level = level.lower() if isinstance(level, str) else 'medium'
         
         if level in ['critical', 'high']:
-            return self.colors['danger']
+            return _DANGER
         elif level == 'medium':
-            return self.colors['warning']
+            return _WARNING
         else:
-            return self.colors['success']
+            return _SUCCESS
     
-    def generate_clause_report(self, clauses: List[Dict]) -> bytes:
+    @_cached_report
+    def generate_clause_report(self, clauses: List[Dict],
+                               *, out: Optional[BinaryIO] = None) -> Optional[bytes]:
         """
         Generate a report focused on clause analysis.
         
         Args:
             clauses: List of analyzed clauses
+            out: Binary stream to write the PDF to instead of returning it
             
         Returns:
-            PDF content as bytes
+            PDF content as bytes, or None if written to out
         """
-        from fpdf import FPDF
+        pdf = self._new_pdf()
         
-        pdf = FPDF()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.add_page()
+        self._add_page(pdf, "Clause-by-Clause Analysis")
         
-        self._add_header(pdf, "Clause-by-Clause Analysis")
+        # Preview lines span the full width between the page margins
+        line_width = pdf.epw - 2 * pdf.c_margin
         
         for i, clause in enumerate(clauses[:20], 1):  # Limit to 20 clauses
-            pdf.set_font('Helvetica', 'B', 11)
+            # Content preview
+            content = clause.get('content', '')
+            preview = content if len(content) <= 300 else content[:300] + "..."
+            
+            # Start a new page up front unless the whole clause fits below:
+            # title (8) + risk (6) + preview lines (5 each) + spacing (5)
+            self._set_font(pdf, '', 9)
+            preview_lines = max(1, math.ceil(pdf.get_string_width(preview) / line_width))
+            if pdf.get_y() + 19 + 5 * preview_lines > pdf.page_break_trigger:
+                pdf.add_page()
+            
+            self._set_font(pdf, 'B', 11)
             title = clause.get('title', f'Clause {i}')
-            pdf.cell(0, 8, f"{i}. {title}", ln=True)
+            pdf.cell(0, 8, f"{i}. {title}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             
             # Risk indicator
             risk_level = clause.get('risk_level', 'low')
             color = self._get_risk_color(risk_level)
             pdf.set_text_color(*color)
-            pdf.set_font('Helvetica', 'B', 9)
-            pdf.cell(0, 6, f"Risk: {risk_level.upper()}", ln=True)
-            pdf.set_text_color(*self.colors['black'])
+            self._set_font(pdf, 'B', 9)
+            pdf.cell(0, 6, f"Risk: {risk_level.upper()}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            pdf.set_text_color(*_BLACK)
             
-            # Content preview
-            content = clause.get('content', '')[:300]
-            pdf.set_font('Helvetica', '', 9)
-            pdf.multi_cell(0, 5, content + "..." if len(clause.get('content', '')) > 300 else content)
+            self._set_font(pdf, '', 9)
+            pdf.multi_cell(0, 5, preview)
             
             pdf.ln(5)
-            
-            # Check if we need a new page
-            if pdf.get_y() > 250:
-                pdf.add_page()
         
-        self._add_footer(pdf)
-        
-        return pdf.output()
+        return self._output(pdf, out)
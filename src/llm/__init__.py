@@ -1,4 +1,4 @@
 """LLM Integration Module"""
-from .gpt_client import GPTClient
+from .gpt_client import GPTClient, BulkAnalyzer
 from .prompts import PromptTemplates
 from .response_parser import ResponseParser
@@ -5,27 +5,322 @@ Integration with OpenAI GPT for legal reasoning
 
 import json
 import os
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
-import openai
-from openai import OpenAI
+import re
+import copy
+import asyncio
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, replace
+import numpy as np
+
+if TYPE_CHECKING:
+    # openai (and httpx under it) takes ~0.5s to import, so it is only
+    # loaded once a configured client actually needs it
+    from openai import AsyncOpenAI, OpenAI
+
+try:
+    import orjson
+    # Several times faster on the multi-KB JSON analyses; its decode error
+    # subclasses json.JSONDecodeError
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+# app.py and the tests already put the project root first on sys.path; only
+# direct imports of this module from elsewhere need it added
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+
+from config.settings import (
+    OPENAI_API_KEY, OPENAI_MODEL, OPENAI_MAX_TOKENS, OPENAI_TEMPERATURE,
+    OPENAI_EMBEDDING_MODEL, OPENAI_MAX_CONCURRENT_REQUESTS, OPENAI_MAX_RETRIES,
+    OPENAI_STRUCTURED_OUTPUTS,
+    SEMANTIC_CACHE_ENABLED, SEMANTIC_CACHE_THRESHOLD
+)
+from src.llm.prompts import PromptTemplates, RESPONSE_SCHEMAS
+
+
+# Number of successful responses kept for repeated identical requests
+_RESPONSE_CACHE_SIZE = 1024
+
+# Most clauses assessed in one request; answers degrade on longer lists
+_RISK_BATCH_SIZE = 32
+
+# With structured outputs the request carries the JSON schema, so the
+# example response in the templates only adds input tokens
+_JSON_EXAMPLES = not OPENAI_STRUCTURED_OUTPUTS
+
+# Shared by all clients (the app creates one per session); keyed by BLAKE2b
+# of the model, messages and generation settings
+_response_cache: "OrderedDict[bytes, GPTResponse]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+# Markdown code fences around JSON; an unclosed fence runs to the end
+_JSON_FENCE_RE = re.compile(r"```json(.*?)(?:```|\Z)", re.DOTALL)
+_FENCE_RE = re.compile(r"```(.*?)(?:```|\Z)", re.DOTALL)
+
+# Amounts, durations and section numbers; clauses that differ only in these
+# embed almost identically but must not share a cached analysis
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+# Capitalised words and runs of them (party names, places, defined terms)
+_NAME_RE = re.compile(r"\b[A-Z][\w&.'-]*(?:[ \t]+[A-Z][\w&.'-]*)*")
+
+
+def _contract_terms(contract_text: str) -> str:
+    """
+    Digest of the numbers and names in a contract, in order.
+    
+    Contracts drawn from one template embed almost identically, so this
+    keeps them from sharing a cached classification or summary unless their
+    parties, amounts and dates all match.
+    """
+    terms = _NUMBER_RE.findall(contract_text) + _NAME_RE.findall(contract_text)
+    return hashlib.blake2b('\x00'.join(terms).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _parse_json(content: str) -> Optional[Any]:
+    """Parse the JSON in a model response, with or without a code fence."""
+    stripped = content.strip()
+    
+    # Common case: a bare JSON object, with no fence to look for
+    bare = stripped.startswith('{') and stripped.endswith('}')
+    if bare:
+        try:
+            return _json_loads(stripped)
+        except json.JSONDecodeError:
+            pass
+    
+    match = _JSON_FENCE_RE.search(content) or _FENCE_RE.search(content)
+    if match:
+        stripped = match.group(1).strip()
+    elif bare:
+        return None
+    
+    try:
+        return _json_loads(stripped)
+    except json.JSONDecodeError:
+        return None
+
+
+# Contract budgets are in tokens; without tiktoken they fall back to this
+# many characters per token, about right for English legal text
+_CHARS_PER_TOKEN = 4
+_CONTINUES_MARKER = "\n\n[... contract continues ...]"
+
+
+@functools.lru_cache(maxsize=4)
+def _get_encoding(model: str):
+    """Return the tiktoken encoding for model, or None when it cannot be loaded."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    # The BPE files are downloaded on first use and may be unreachable; any
+    # failure (cached like a success) leaves truncation to the character budget
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            # Models newer than the installed tiktoken
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=2)
+def _encode_contract(contract_text: str, model: str) -> List[int]:
+    """Tokenize a contract once for all the budgets batch_analyze cuts it to."""
+    # Contracts are user text; a literal "<|endoftext|>" must not raise
+    return _get_encoding(model).encode(contract_text, disallowed_special=())
+
+
+@functools.lru_cache(maxsize=8)
+def _truncate_contract(contract_text: str, max_tokens: int, model: str) -> str:
+    """
+    Cut contract text to max_tokens of model's tokenizer, marking that it continues.
+    
+    batch_analyze sends one contract through several methods, several of
+    which use the same limit; the cache returns the same truncated copy.
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        max_chars = max_tokens * _CHARS_PER_TOKEN
+        if len(contract_text) <= max_chars:
+            return contract_text
+        return contract_text[:max_chars] + _CONTINUES_MARKER
+    
+    # A token covers at least one UTF-8 byte, so short text cannot be over budget
+    if len(contract_text) <= max_tokens and contract_text.isascii():
+        return contract_text
+    tokens = _encode_contract(contract_text, model)
+    if len(tokens) <= max_tokens:
+        return contract_text
+    return encoding.decode(tokens[:max_tokens]) + _CONTINUES_MARKER
+
+
+# One sync client per API key, shared by every GPTClient (the app creates one
+# per session) so HTTP connections are kept alive and reused across them
+_openai_clients: Dict[str, "OpenAI"] = {}
+_openai_clients_lock = threading.Lock()
+
+# Keep idle connections for 30s (httpx's default is 5s, shorter than the
+# gap between most user actions, so each action paid a new TLS handshake)
+_HTTP_LIMITS = dict(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+
+
+def _get_openai_client(api_key: str) -> "OpenAI":
+    """Return the shared OpenAI client for api_key, creating it on first use."""
+    with _openai_clients_lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            import httpx
+            import openai
+            client = openai.OpenAI(
+                api_key=api_key,
+                max_retries=OPENAI_MAX_RETRIES,
+                http_client=openai.DefaultHttpxClient(limits=httpx.Limits(**_HTTP_LIMITS))
+            )
+            _openai_clients[api_key] = client
+        return client
+
+
+def _cached_response(cache_key: bytes) -> Optional["GPTResponse"]:
+    """Return a copy of the cached response for cache_key, if any."""
+    with _response_cache_lock:
+        cached = _response_cache.get(cache_key)
+        if cached is None:
+            return None
+        _response_cache.move_to_end(cache_key)
+    # Callers may modify parsed_json, so each hit gets its own copy
+    return replace(cached, parsed_json=copy.deepcopy(cached.parsed_json))
 
-from config.settings import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_MAX_TOKENS, OPENAI_TEMPERATURE
-from src.llm.prompts import PromptTemplates
 
+def _store_response(cache_key: bytes, response: "GPTResponse"):
+    """Cache a copy of a successful response."""
+    with _response_cache_lock:
+        _response_cache[cache_key] = replace(response, parsed_json=copy.deepcopy(response.parsed_json))
+        if len(_response_cache) > _RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class GPTResponse:
-    """Data class for GPT response."""
+    """Data class for GPT response (immutable, so cached responses can be shared)."""
     content: str
     parsed_json: Optional[Dict] = None
     tokens_used: int = 0
     model: str = ""
     success: bool = True
     error: Optional[str] = None
+    # The model stopped at the token limit; such responses are never cached
+    truncated: bool = False
+    
+    @property
+    def cacheable(self) -> bool:
+        """Whether the response is complete and may be reused for later requests."""
+        return self.success and not self.truncated
+
+
+class SemanticCache:
+    """
+    Responses for near-duplicate inputs, matched by embedding similarity.
+    
+    Entries are kept per namespace (the method name plus any arguments that
+    must match exactly, such as the clause type), so similar text never
+    returns an answer produced for a different question.
+    """
+    
+    def __init__(self, client: "OpenAI",
+                 model: str = OPENAI_EMBEDDING_MODEL,
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 max_entries: int = 256):
+        self.client = client
+        self.model = model
+        self.threshold = threshold
+        self.max_entries = max_entries
+        
+        self._lock = threading.Lock()
+        # Unit-length embeddings of inputs already seen, by BLAKE2b of the text
+        self._embeddings: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        # Per namespace: one embedding per row, and the response for each row.
+        # Namespaces are dropped least recently used first once there are
+        # more than max_entries of them.
+        self._vectors: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._responses: Dict[tuple, List[GPTResponse]] = {}
+    
+    def embed(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Embed texts, requesting all uncached ones in a single API call.
+        
+        Returns None for every text that could not be embedded.
+        """
+        keys = [hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest() for text in texts]
+        with self._lock:
+            vectors = [self._embeddings.get(key) for key in keys]
+        
+        missing = {}
+        for text, key, vector in zip(texts, keys, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+        
+        if missing:
+            try:
+                response = self.client.embeddings.create(model=self.model, input=list(missing.values()))
+            except Exception:
+                return vectors
+            
+            fetched = {}
+            for key, item in zip(missing, response.data):
+                vector = np.asarray(item.embedding, dtype=np.float32)
+                fetched[key] = vector / np.linalg.norm(vector)
+            with self._lock:
+                self._embeddings.update(fetched)
+                while len(self._embeddings) > 4 * self.max_entries:
+                    self._embeddings.popitem(last=False)
+            vectors = [fetched[key] if vector is None else vector
+                       for key, vector in zip(keys, vectors)]
+        
+        return vectors
+    
+    def lookup(self, namespace: tuple, vector: np.ndarray) -> Optional[GPTResponse]:
+        """Return a copy of the most similar cached response at or above the threshold."""
+        with self._lock:
+            matrix = self._vectors.get(namespace)
+            if matrix is None:
+                return None
+            similarities = matrix @ vector
+            best = int(similarities.argmax())
+            if similarities[best] < self.threshold:
+                return None
+            response = self._responses[namespace][best]
+        return replace(response, parsed_json=copy.deepcopy(response.parsed_json))
+    
+    def add(self, namespace: tuple, vector: np.ndarray, response: GPTResponse):
+        """Store a response, dropping the namespace's oldest entry when full."""
+        response = replace(response, parsed_json=copy.deepcopy(response.parsed_json))
+        with self._lock:
+            matrix = self._vectors.get(namespace)
+            responses = self._responses.setdefault(namespace, [])
+            if matrix is None:
+                matrix = vector[np.newaxis, :]
+            else:
+                if len(responses) >= self.max_entries:
+                    matrix = matrix[1:]
+                    del responses[0]
+                matrix = np.vstack([matrix, vector])
+            self._vectors[namespace] = matrix
+            self._vectors.move_to_end(namespace)
+            responses.append(response)
+            if len(self._vectors) > self.max_entries:
+                oldest, _ = self._vectors.popitem(last=False)
+                del self._responses[oldest]
 
 
 class GPTClient:
@@ -41,22 +336,235 @@ class GPTClient:
         self.temperature = OPENAI_TEMPERATURE
         
         if self.api_key:
-            self.client = OpenAI(api_key=self.api_key)
+            self.client = _get_openai_client(self.api_key)
         else:
             self.client = None
+        # Created by _get_async_client for the event loop it runs in
+        self.async_client: Optional["AsyncOpenAI"] = None
+        self._async_semaphore: Optional[asyncio.Semaphore] = None
+        self._async_loop = None
+        
+        # Kept per client so one session never gets answers for another's contracts
+        if self.client is not None and SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticCache(self.client)
+        else:
+            self.semantic_cache = None
         
-        self.prompts = PromptTemplates()
+        # Every template method is static, so the class serves as the namespace
+        self.prompts = PromptTemplates
         self.system_prompt = PromptTemplates.get_system_prompt()
     
     def is_configured(self) -> bool:
         """Check if the client is properly configured."""
         return self.api_key is not None and len(self.api_key) > 0
     
+    def _get_async_client(self) -> Tuple["AsyncOpenAI", asyncio.Semaphore]:
+        """Return the AsyncOpenAI client and request semaphore for the running event loop."""
+        # httpx connections belong to the loop that opened them, and every
+        # asyncio.run() (as in batch_analyze) starts a new loop
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            import httpx
+            import openai
+            self.async_client = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                max_retries=OPENAI_MAX_RETRIES,
+                http_client=openai.DefaultAsyncHttpxClient(limits=httpx.Limits(**_HTTP_LIMITS))
+            )
+            self._async_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENT_REQUESTS)
+            self._async_loop = loop
+        return self.async_client, self._async_semaphore
+    
+    async def aclose(self):
+        """Close the AsyncOpenAI client and its connection pool, if one is open."""
+        client, loop = self.async_client, self._async_loop
+        self.async_client = None
+        self._async_semaphore = None
+        self._async_loop = None
+        # A client opened in an earlier, finished loop cannot be closed from this one
+        if client is not None and loop is asyncio.get_running_loop():
+            await client.close()
+    
+    def _run_sync(self, coro):
+        """Run a coroutine with asyncio.run(), closing the async client it opens."""
+        async def run_and_close():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+        
+        return asyncio.run(run_and_close())
+    
+    def _not_configured_response(self) -> GPTResponse:
+        return GPTResponse(
+            content="",
+            success=False,
+            error="OpenAI API key not configured. Please set OPENAI_API_KEY in .env file."
+        )
+    
+    def _prepare_request(self, user_prompt: str,
+                         system_prompt: Optional[str],
+                         temperature: Optional[float],
+                         max_tokens: Optional[int],
+                         json_mode: bool,
+                         schema: Optional[str] = None,
+                         context: Optional[str] = None) -> Tuple[Dict, bytes]:
+        """Build the chat completion arguments and their response cache key."""
+        system_prompt = system_prompt or self.system_prompt
+        temperature = temperature or self.temperature
+        max_tokens = max_tokens or self.max_tokens
+        
+        messages = [{"role": "system", "content": system_prompt}]
+        if context is not None:
+            messages.append({"role": "user", "content": context})
+        messages.append({"role": "user", "content": user_prompt})
+        
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if schema is not None and OPENAI_STRUCTURED_OUTPUTS:
+            kwargs["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": schema, "strict": True, "schema": RESPONSE_SCHEMAS[schema]}
+            }
+        elif json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        else:
+            schema = None
+        if context is not None:
+            # Prefix caching only applies when requests reach a server that
+            # has seen the prefix; the key routes every analysis of one
+            # contract (system prompt + contract, well over the 1024-token
+            # minimum) together. Sent as extra_body for older SDKs.
+            prefix_key = hashlib.blake2b(context.encode('utf-8'), digest_size=8).hexdigest()
+            kwargs["extra_body"] = {"prompt_cache_key": f"contract-{prefix_key}"}
+        
+        # Hash the prompts directly rather than a JSON dump of kwargs, which
+        # copied (and escaped) the whole contract text once more; the lengths
+        # keep the boundaries between the messages unambiguous
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((self.model, temperature, max_tokens, json_mode, schema,
+                            [len(message["content"]) for message in messages])).encode('utf-8'))
+        for message in messages:
+            digest.update(message["content"].encode('utf-8'))
+        cache_key = digest.digest()
+        
+        return kwargs, cache_key
+    
+    def _parse_completion(self, response, json_mode: bool) -> GPTResponse:
+        """Convert a chat completion into a GPTResponse."""
+        choice = response.choices[0]
+        # With structured outputs a refusal replaces the content
+        refusal = getattr(choice.message, 'refusal', None)
+        if refusal:
+            return self._refusal_response(refusal)
+        
+        tokens_used = response.usage.total_tokens if response.usage else 0
+        result = self._build_response(choice.message.content or "", tokens_used, json_mode)
+        return self._check_complete(result, json_mode, choice.finish_reason)
+    
+    @staticmethod
+    def _refusal_response(refusal: str) -> GPTResponse:
+        return GPTResponse(content="", success=False, error=f"Request refused by the model: {refusal}")
+    
+    @staticmethod
+    def _check_complete(result: GPTResponse, json_mode: bool, finish_reason: Optional[str]) -> GPTResponse:
+        """
+        Mark a response cut off by the token limit as truncated.
+        
+        A truncated JSON response without parseable JSON cannot match its
+        schema and fails; truncated text is returned as is.
+        """
+        if finish_reason != "length":
+            return result
+        if json_mode and result.parsed_json is None:
+            return replace(result, success=False, truncated=True,
+                           error="Response reached the token limit before the JSON was complete")
+        return replace(result, truncated=True)
+    
+    def _stream_completion(self, kwargs: Dict, json_mode: bool,
+                           on_delta: Callable[[str], None]) -> GPTResponse:
+        """Request a streamed completion, passing each text delta to on_delta as it arrives."""
+        stream = self.client.chat.completions.create(
+            **kwargs, stream=True, stream_options={"include_usage": True}
+        )
+        
+        parts = []
+        refusal_parts = []
+        tokens_used = 0
+        finish_reason = None
+        for chunk in stream:
+            # The final chunk carries usage and no choices
+            if chunk.usage:
+                tokens_used = chunk.usage.total_tokens
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                refusal = getattr(choice.delta, 'refusal', None)
+                if refusal:
+                    refusal_parts.append(refusal)
+                delta = choice.delta.content
+                if delta:
+                    parts.append(delta)
+                    on_delta(delta)
+        
+        if refusal_parts:
+            return self._refusal_response(''.join(refusal_parts))
+        result = self._build_response(''.join(parts), tokens_used, json_mode)
+        return self._check_complete(result, json_mode, finish_reason)
+    
+    def _build_response(self, content: str, tokens_used: int, json_mode: bool) -> GPTResponse:
+        """Wrap response text in a GPTResponse, parsing any JSON it contains."""
+        # Try to parse JSON if expected
+        parsed_json = None
+        if json_mode or content.lstrip().startswith('{'):
+            parsed_json = _parse_json(content)
+        
+        return GPTResponse(
+            content=content,
+            parsed_json=parsed_json,
+            tokens_used=tokens_used,
+            model=self.model,
+            success=True
+        )
+    
+    def _batch_body(self, user_prompt: str, context: Optional[str] = None,
+                    schema: Optional[str] = None, max_tokens: Optional[int] = None,
+                    **semantic) -> Dict:
+        """Chat completion arguments for a Batch API request, as _call_gpt would send them."""
+        kwargs, _ = self._prepare_request(user_prompt, None, None, max_tokens,
+                                          schema is not None, schema, context)
+        # The request body is sent as is, so extra_body fields go in it directly
+        kwargs.update(kwargs.pop("extra_body", {}))
+        return kwargs
+    
+    @staticmethod
+    def _error_response(e: Exception) -> GPTResponse:
+        """Convert an exception raised by an API call into a failed GPTResponse."""
+        import openai
+        if isinstance(e, openai.APIConnectionError):
+            error = f"Connection error: {str(e)}"
+        elif isinstance(e, openai.RateLimitError):
+            error = f"Rate limit exceeded: {str(e)}"
+        elif isinstance(e, openai.APIStatusError):
+            error = f"API error: {str(e)}"
+        else:
+            error = f"Unexpected error: {str(e)}"
+        return GPTResponse(content="", success=False, error=error)
+    
     def _call_gpt(self, user_prompt: str, 
                   system_prompt: Optional[str] = None,
                   temperature: Optional[float] = None,
                   max_tokens: Optional[int] = None,
-                  json_mode: bool = False) -> GPTResponse:
+                  json_mode: bool = False,
+                  on_delta: Optional[Callable[[str], None]] = None,
+                  schema: Optional[str] = None,
+                  context: Optional[str] = None,
+                  check: Optional[Callable[[GPTResponse], GPTResponse]] = None) -> GPTResponse:
         """
         Make a call to the GPT API.
         
@@ -66,84 +574,140 @@ class GPTClient:
             temperature: Optional temperature override
             max_tokens: Optional max tokens override
             json_mode: Whether to request JSON response
+            on_delta: Optional callback; the response is streamed and each
+                piece of text is passed to it as it arrives
+            schema: Optional RESPONSE_SCHEMAS name; the response must follow
+                that JSON schema (implies json_mode)
+            context: Optional user message sent before user_prompt (the
+                contract text, so analyses of one contract share a prefix)
+            check: Optional validation applied before the response is cached;
+                it returns the response, or a failed one that is not cached
             
         Returns:
             GPTResponse object
         """
         if not self.is_configured():
-            return GPTResponse(
-                content="",
-                success=False,
-                error="OpenAI API key not configured. Please set OPENAI_API_KEY in .env file."
-            )
+            return self._not_configured_response()
+        
+        json_mode = json_mode or schema is not None
+        kwargs, cache_key = self._prepare_request(user_prompt, system_prompt, temperature, max_tokens,
+                                                  json_mode, schema, context)
+        
+        # Identical requests are answered from the cache without an API call
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            if on_delta is not None:
+                on_delta(cached.content)
+            return cached
         
         try:
-            messages = [
-                {"role": "system", "content": system_prompt or self.system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-            
-            kwargs = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": temperature or self.temperature,
-                "max_tokens": max_tokens or self.max_tokens
-            }
-            
-            if json_mode:
-                kwargs["response_format"] = {"type": "json_object"}
-            
-            response = self.client.chat.completions.create(**kwargs)
-            
-            content = response.choices[0].message.content
-            tokens_used = response.usage.total_tokens if response.usage else 0
-            
-            # Try to parse JSON if expected
-            parsed_json = None
-            if json_mode or content.strip().startswith('{'):
-                try:
-                    # Clean up the response if needed
-                    json_str = content
-                    if '```json' in json_str:
-                        json_str = json_str.split('```json')[1].split('```')[0]
-                    elif '```' in json_str:
-                        json_str = json_str.split('```')[1].split('```')[0]
-                    parsed_json = json.loads(json_str.strip())
-                except json.JSONDecodeError:
-                    pass
-            
-            return GPTResponse(
-                content=content,
-                parsed_json=parsed_json,
-                tokens_used=tokens_used,
-                model=self.model,
-                success=True
-            )
-            
-        except openai.APIConnectionError as e:
-            return GPTResponse(
-                content="",
-                success=False,
-                error=f"Connection error: {str(e)}"
-            )
-        except openai.RateLimitError as e:
-            return GPTResponse(
-                content="",
-                success=False,
-                error=f"Rate limit exceeded: {str(e)}"
-            )
-        except openai.APIStatusError as e:
-            return GPTResponse(
-                content="",
-                success=False,
-                error=f"API error: {str(e)}"
-            )
+            if on_delta is not None:
+                result = self._stream_completion(kwargs, json_mode, on_delta)
+            else:
+                response = self.client.chat.completions.create(**kwargs)
+                result = self._parse_completion(response, json_mode)
         except Exception as e:
-            return GPTResponse(
-                content="",
-                success=False,
-                error=f"Unexpected error: {str(e)}"
-            )
+            return self._error_response(e)
+        
+        if check is not None:
+            result = check(result)
+        if result.cacheable:
+            _store_response(cache_key, result)
+        return result
+    
+    async def _call_gpt_async(self, user_prompt: str,
+                              system_prompt: Optional[str] = None,
+                              temperature: Optional[float] = None,
+                              max_tokens: Optional[int] = None,
+                              json_mode: bool = False,
+                              schema: Optional[str] = None,
+                              context: Optional[str] = None) -> GPTResponse:
+        """Async version of _call_gpt; shares its response cache."""
+        if not self.is_configured():
+            return self._not_configured_response()
+        
+        json_mode = json_mode or schema is not None
+        kwargs, cache_key = self._prepare_request(user_prompt, system_prompt, temperature, max_tokens,
+                                                  json_mode, schema, context)
+        
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        client, semaphore = self._get_async_client()
+        try:
+            # Bound concurrent requests; the SDK retries rate-limit (429) and
+            # connection errors with exponential backoff, honoring retry-after
+            async with semaphore:
+                response = await client.chat.completions.create(**kwargs)
+            result = self._parse_completion(response, json_mode)
+        except Exception as e:
+            return self._error_response(e)
+        
+        if result.cacheable:
+            _store_response(cache_key, result)
+        return result
+    
+    def _call_gpt_semantic(self, namespace: tuple, text: str,
+                           user_prompt: str, **kwargs) -> GPTResponse:
+        """
+        Call the GPT API unless a response for near-duplicate text is cached.
+        
+        Args:
+            namespace: Method name plus the arguments that must match exactly
+            text: The input compared for similarity (contract or clause text)
+            user_prompt: The user message/prompt
+            **kwargs: Passed on to _call_gpt
+            
+        Returns:
+            GPTResponse object
+        """
+        if self.semantic_cache is None:
+            return self._call_gpt(user_prompt, **kwargs)
+        
+        vector = self.semantic_cache.embed([text])[0]
+        if vector is not None:
+            cached = self.semantic_cache.lookup(namespace, vector)
+            if cached is not None:
+                if kwargs.get('on_delta') is not None:
+                    kwargs['on_delta'](cached.content)
+                return cached
+        
+        response = self._call_gpt(user_prompt, **kwargs)
+        if vector is not None and response.cacheable:
+            self.semantic_cache.add(namespace, vector, response)
+        return response
+    
+    async def _call_gpt_semantic_async(self, namespace: tuple, text: str,
+                                       user_prompt: str, **kwargs) -> GPTResponse:
+        """Async version of _call_gpt_semantic."""
+        if self.semantic_cache is None:
+            return await self._call_gpt_async(user_prompt, **kwargs)
+        
+        # The embedding request uses the sync client, so keep it off the loop
+        vector = (await asyncio.to_thread(self.semantic_cache.embed, [text]))[0]
+        if vector is not None:
+            cached = self.semantic_cache.lookup(namespace, vector)
+            if cached is not None:
+                return cached
+        
+        response = await self._call_gpt_async(user_prompt, **kwargs)
+        if vector is not None and response.cacheable:
+            self.semantic_cache.add(namespace, vector, response)
+        return response
+    
+    def _classify_contract_request(self, contract_text: str) -> Dict:
+        """Arguments for the classification call, shared by the sync and async methods."""
+        contract_text = _truncate_contract(contract_text, 3750, self.model)
+        
+        context, prompt = PromptTemplates.build_contract_prompt(
+            'contract_classification',
+            contract_text,
+            json_example=_JSON_EXAMPLES
+        )
+        
+        return dict(namespace=('classify_contract', _contract_terms(contract_text)), text=contract_text, user_prompt=prompt,
+                    context=context, schema='contract_classification')
     
     def classify_contract(self, contract_text: str) -> GPTResponse:
         """
@@ -155,36 +719,85 @@ class GPTClient:
         Returns:
             GPTResponse with classification results
         """
-        # Truncate if too long
-        max_chars = 15000
-        if len(contract_text) > max_chars:
-            contract_text = contract_text[:max_chars] + "\n\n[... contract continues ...]"
-        
+        return self._call_gpt_semantic(**self._classify_contract_request(contract_text))
+    
+    async def classify_contract_async(self, contract_text: str) -> GPTResponse:
+        """Async version of classify_contract."""
+        return await self._call_gpt_semantic_async(**self._classify_contract_request(contract_text))
+    
+    def _explain_clause_request(self, clause_text: str, clause_type: str) -> Dict:
+        """Arguments for the explanation call, shared by the sync and async methods."""
         prompt = PromptTemplates.build_prompt(
-            'contract_classification',
-            contract_text=contract_text
+            'clause_explanation',
+            clause_text=clause_text,
+            clause_type=clause_type
         )
         
-        return self._call_gpt(prompt, json_mode=True)
+        return dict(namespace=('explain_clause', clause_type, *_NUMBER_RE.findall(clause_text)),
+                    text=clause_text, user_prompt=prompt)
     
-    def explain_clause(self, clause_text: str, clause_type: str) -> GPTResponse:
+    def explain_clause(self, clause_text: str, clause_type: str,
+                       on_delta: Optional[Callable[[str], None]] = None) -> GPTResponse:
         """
         Explain a clause in plain language.
         
         Args:
             clause_text: The clause to explain
             clause_type: The type of clause
+            on_delta: Optional callback receiving the explanation as it streams in
             
         Returns:
             GPTResponse with explanation
         """
+        return self._call_gpt_semantic(**self._explain_clause_request(clause_text, clause_type),
+                                       on_delta=on_delta)
+    
+    async def explain_clause_async(self, clause_text: str, clause_type: str) -> GPTResponse:
+        """Async version of explain_clause."""
+        return await self._call_gpt_semantic_async(**self._explain_clause_request(clause_text, clause_type))
+    
+    def explain_clause_many(self, clauses: List[Tuple[str, str]]) -> List[GPTResponse]:
+        """
+        Explain several clauses concurrently.
+        
+        Args:
+            clauses: (clause_text, clause_type) pairs
+            
+        Returns:
+            GPTResponses in the same order as clauses
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self._run_sync(self.explain_clause_many_async(clauses))
+        
+        # asyncio.run() cannot be used inside a running event loop
+        return [self.explain_clause(clause_text, clause_type) for clause_text, clause_type in clauses]
+    
+    async def explain_clause_many_async(self, clauses: List[Tuple[str, str]]) -> List[GPTResponse]:
+        """Async version of explain_clause_many."""
+        # One embedding request for every clause the semantic cache will compare
+        if self.semantic_cache is not None and clauses:
+            await asyncio.to_thread(self.semantic_cache.embed, [clause_text for clause_text, _ in clauses])
+        
+        return list(await asyncio.gather(
+            *(self.explain_clause_async(clause_text, clause_type) for clause_text, clause_type in clauses)
+        ))
+    
+    def _assess_clause_risk_request(self, clause_text: str, clause_type: str,
+                                    contract_type: str) -> Dict:
+        """Arguments for the risk assessment call, shared by the sync and async methods."""
         prompt = PromptTemplates.build_prompt(
-            'clause_explanation',
+            'risk_assessment',
             clause_text=clause_text,
-            clause_type=clause_type
+            clause_type=clause_type,
+            contract_type=contract_type,
+            json_example=_JSON_EXAMPLES
         )
         
-        return self._call_gpt(prompt)
+        return dict(namespace=('assess_clause_risk', clause_type, contract_type,
+                               *_NUMBER_RE.findall(clause_text)),
+                    text=clause_text, user_prompt=prompt, schema='risk_assessment')
     
     def assess_clause_risk(self, clause_text: str, 
                            clause_type: str,
@@ -200,36 +813,162 @@ class GPTClient:
         Returns:
             GPTResponse with risk assessment
         """
-        prompt = PromptTemplates.build_prompt(
-            'risk_assessment',
-            clause_text=clause_text,
-            clause_type=clause_type,
-            contract_type=contract_type
+        return self._call_gpt_semantic(
+            **self._assess_clause_risk_request(clause_text, clause_type, contract_type)
+        )
+    
+    async def assess_clause_risk_async(self, clause_text: str, clause_type: str,
+                                       contract_type: str) -> GPTResponse:
+        """Async version of assess_clause_risk."""
+        return await self._call_gpt_semantic_async(
+            **self._assess_clause_risk_request(clause_text, clause_type, contract_type)
+        )
+    
+    def assess_clause_risk_many(self, clauses: List[Tuple[str, str]],
+                                contract_type: str) -> List[GPTResponse]:
+        """
+        Assess the risk of several clauses concurrently.
+        
+        The requests share the client's concurrency limit, so this takes
+        about as long as the slowest batch of them.
+        
+        Args:
+            clauses: (clause_text, clause_type) pairs
+            contract_type: The type of contract
+            
+        Returns:
+            GPTResponses in the same order as clauses
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self._run_sync(self.assess_clause_risk_many_async(clauses, contract_type))
+        
+        # asyncio.run() cannot be used inside a running event loop
+        return [self.assess_clause_risk(clause_text, clause_type, contract_type)
+                for clause_text, clause_type in clauses]
+    
+    async def assess_clause_risk_many_async(self, clauses: List[Tuple[str, str]],
+                                            contract_type: str) -> List[GPTResponse]:
+        """Async version of assess_clause_risk_many."""
+        # One embedding request for every clause the semantic cache will compare
+        if self.semantic_cache is not None and clauses:
+            await asyncio.to_thread(self.semantic_cache.embed, [clause_text for clause_text, _ in clauses])
+        
+        return list(await asyncio.gather(
+            *(self.assess_clause_risk_async(clause_text, clause_type, contract_type)
+              for clause_text, clause_type in clauses)
+        ))
+    
+    def assess_clause_risk_batch(self, clauses: List[Tuple[str, str]],
+                                 contract_type: str) -> List[GPTResponse]:
+        """
+        Assess the risk of several clauses, sending up to 32 per request.
+        
+        Args:
+            clauses: (clause_text, clause_type) pairs
+            contract_type: The type of contract
+            
+        Returns:
+            One GPTResponse per clause, in the same order as clauses; the
+            tokens used by each request are counted on its first clause
+        """
+        results = []
+        for start in range(0, len(clauses), _RISK_BATCH_SIZE):
+            batch = clauses[start:start + _RISK_BATCH_SIZE]
+            clauses_json = json.dumps(
+                [{"clause_type": clause_type, "clause_text": clause_text}
+                 for clause_text, clause_type in batch],
+                ensure_ascii=False
+            )
+            prompt = PromptTemplates.build_prompt(
+                'risk_assessment_batch',
+                clauses_json=clauses_json,
+                contract_type=contract_type,
+                json_example=_JSON_EXAMPLES
+            )
+            
+            # A reply with the wrong number of assessments fails before it
+            # can be cached, so retrying the batch asks the model again
+            response = self._call_gpt(prompt, schema='risk_assessment_batch',
+                                      max_tokens=max(self.max_tokens, 300 * len(batch)),
+                                      check=functools.partial(self._check_risk_batch, count=len(batch)))
+            results.extend(self._split_risk_batch(response, len(batch)))
+        
+        return results
+    
+    @staticmethod
+    def _check_risk_batch(response: GPTResponse, count: int) -> GPTResponse:
+        """Fail a batched risk assessment that does not have one assessment per clause."""
+        if not response.success:
+            return response
+        assessments = (response.parsed_json or {}).get('assessments')
+        if not isinstance(assessments, list) or len(assessments) != count:
+            return replace(response, success=False,
+                           error=f"Expected {count} risk assessments in the batched response")
+        return response
+    
+    @staticmethod
+    def _split_risk_batch(response: GPTResponse, count: int) -> List[GPTResponse]:
+        """Turn one batched risk assessment into a response per clause."""
+        response = GPTClient._check_risk_batch(response, count)
+        if not response.success:
+            return [GPTResponse(content="", success=False, error=response.error)] * count
+        
+        assessments = response.parsed_json['assessments']
+        return [
+            GPTResponse(
+                content=json.dumps(assessment, ensure_ascii=False),
+                parsed_json=assessment,
+                tokens_used=response.tokens_used if i == 0 else 0,
+                model=response.model
+            )
+            for i, assessment in enumerate(assessments)
+        ]
+    
+    def _generate_summary_request(self, contract_text: str) -> Dict:
+        """Arguments for the summary call, shared by the sync and async methods."""
+        contract_text = _truncate_contract(contract_text, 5000, self.model)
+        
+        context, prompt = PromptTemplates.build_contract_prompt(
+            'contract_summary',
+            contract_text
         )
         
-        return self._call_gpt(prompt, json_mode=True)
+        return dict(namespace=('generate_summary', _contract_terms(contract_text)), text=contract_text, user_prompt=prompt,
+                    context=context, max_tokens=4000)
     
-    def generate_summary(self, contract_text: str) -> GPTResponse:
+    def generate_summary(self, contract_text: str,
+                         on_delta: Optional[Callable[[str], None]] = None) -> GPTResponse:
         """
         Generate a comprehensive contract summary.
         
         Args:
             contract_text: The contract to summarize
+            on_delta: Optional callback receiving the summary as it streams in
             
         Returns:
             GPTResponse with summary
         """
-        # Truncate if too long
-        max_chars = 20000
-        if len(contract_text) > max_chars:
-            contract_text = contract_text[:max_chars] + "\n\n[... contract continues ...]"
+        return self._call_gpt_semantic(**self._generate_summary_request(contract_text), on_delta=on_delta)
+    
+    async def generate_summary_async(self, contract_text: str) -> GPTResponse:
+        """Async version of generate_summary."""
+        return await self._call_gpt_semantic_async(**self._generate_summary_request(contract_text))
+    
+    def _detect_unfavorable_terms_request(self, contract_text: str, party_name: str) -> Dict:
+        """Arguments for the unfavorable terms call, shared by the sync and async methods."""
+        contract_text = _truncate_contract(contract_text, 4500, self.model)
         
-        prompt = PromptTemplates.build_prompt(
-            'contract_summary',
-            contract_text=contract_text
+        context, prompt = PromptTemplates.build_contract_prompt(
+            'unfavorable_terms_detection',
+            contract_text,
+            party_name=party_name,
+            json_example=_JSON_EXAMPLES
         )
         
-        return self._call_gpt(prompt, max_tokens=4000)
+        return dict(user_prompt=prompt, context=context, schema='unfavorable_terms_detection',
+                    max_tokens=4000)
     
     def detect_unfavorable_terms(self, contract_text: str,
                                   party_name: str) -> GPTResponse:
@@ -243,17 +982,12 @@ class GPTClient:
         Returns:
             GPTResponse with unfavorable terms
         """
-        max_chars = 18000
-        if len(contract_text) > max_chars:
-            contract_text = contract_text[:max_chars] + "\n\n[... contract continues ...]"
-        
-        prompt = PromptTemplates.build_prompt(
-            'unfavorable_terms_detection',
-            contract_text=contract_text,
-            party_name=party_name
-        )
-        
-        return self._call_gpt(prompt, json_mode=True, max_tokens=4000)
+        return self._call_gpt(**self._detect_unfavorable_terms_request(contract_text, party_name))
+    
+    async def detect_unfavorable_terms_async(self, contract_text: str,
+                                             party_name: str) -> GPTResponse:
+        """Async version of detect_unfavorable_terms."""
+        return await self._call_gpt_async(**self._detect_unfavorable_terms_request(contract_text, party_name))
     
     def suggest_alternative_clause(self, original_clause: str,
                                     issue: str,
@@ -278,6 +1012,19 @@ class GPTClient:
         
         return self._call_gpt(prompt)
     
+    def _check_compliance_request(self, contract_text: str, contract_type: str) -> Dict:
+        """Arguments for the compliance call, shared by the sync and async methods."""
+        contract_text = _truncate_contract(contract_text, 4500, self.model)
+        
+        context, prompt = PromptTemplates.build_contract_prompt(
+            'compliance_check',
+            contract_text,
+            contract_type=contract_type,
+            json_example=_JSON_EXAMPLES
+        )
+        
+        return dict(user_prompt=prompt, context=context, schema='compliance_check')
+    
     def check_compliance(self, contract_text: str,
                          contract_type: str) -> GPTResponse:
         """
@@ -290,17 +1037,23 @@ class GPTClient:
         Returns:
             GPTResponse with compliance results
         """
-        max_chars = 18000
-        if len(contract_text) > max_chars:
-            contract_text = contract_text[:max_chars] + "\n\n[... contract continues ...]"
+        return self._call_gpt(**self._check_compliance_request(contract_text, contract_type))
+    
+    async def check_compliance_async(self, contract_text: str, contract_type: str) -> GPTResponse:
+        """Async version of check_compliance."""
+        return await self._call_gpt_async(**self._check_compliance_request(contract_text, contract_type))
+    
+    def _extract_obligations_request(self, contract_text: str) -> Dict:
+        """Arguments for the obligations call, shared by the sync and async methods."""
+        contract_text = _truncate_contract(contract_text, 4500, self.model)
         
-        prompt = PromptTemplates.build_prompt(
-            'compliance_check',
-            contract_text=contract_text,
-            contract_type=contract_type
+        context, prompt = PromptTemplates.build_contract_prompt(
+            'obligation_extraction',
+            contract_text,
+            json_example=_JSON_EXAMPLES
         )
         
-        return self._call_gpt(prompt, json_mode=True)
+        return dict(user_prompt=prompt, context=context, schema='obligation_extraction', max_tokens=4000)
     
     def extract_obligations(self, contract_text: str) -> GPTResponse:
         """
@@ -312,16 +1065,23 @@ class GPTClient:
         Returns:
             GPTResponse with extracted terms
         """
-        max_chars = 18000
-        if len(contract_text) > max_chars:
-            contract_text = contract_text[:max_chars] + "\n\n[... contract continues ...]"
+        return self._call_gpt(**self._extract_obligations_request(contract_text))
+    
+    async def extract_obligations_async(self, contract_text: str) -> GPTResponse:
+        """Async version of extract_obligations."""
+        return await self._call_gpt_async(**self._extract_obligations_request(contract_text))
+    
+    def _detect_ambiguities_request(self, contract_text: str) -> Dict:
+        """Arguments for the ambiguity call, shared by the sync and async methods."""
+        contract_text = _truncate_contract(contract_text, 4500, self.model)
         
-        prompt = PromptTemplates.build_prompt(
-            'obligation_extraction',
-            contract_text=contract_text
+        context, prompt = PromptTemplates.build_contract_prompt(
+            'ambiguity_detection',
+            contract_text,
+            json_example=_JSON_EXAMPLES
         )
         
-        return self._call_gpt(prompt, json_mode=True, max_tokens=4000)
+        return dict(user_prompt=prompt, context=context, schema='ambiguity_detection')
     
     def detect_ambiguities(self, contract_text: str) -> GPTResponse:
         """
@@ -333,16 +1093,11 @@ class GPTClient:
         Returns:
             GPTResponse with ambiguity detection results
         """
-        max_chars = 18000
-        if len(contract_text) > max_chars:
-            contract_text = contract_text[:max_chars] + "\n\n[... contract continues ...]"
-        
-        prompt = PromptTemplates.build_prompt(
-            'ambiguity_detection',
-            contract_text=contract_text
-        )
-        
-        return self._call_gpt(prompt, json_mode=True)
+        return self._call_gpt(**self._detect_ambiguities_request(contract_text))
+    
+    async def detect_ambiguities_async(self, contract_text: str) -> GPTResponse:
+        """Async version of detect_ambiguities."""
+        return await self._call_gpt_async(**self._detect_ambiguities_request(contract_text))
     
     def compare_to_template(self, contract_text: str,
                             contract_type: str,
@@ -358,25 +1113,26 @@ class GPTClient:
         Returns:
             GPTResponse with comparison results
         """
-        max_chars = 15000
-        if len(contract_text) > max_chars:
-            contract_text = contract_text[:max_chars] + "\n\n[... contract continues ...]"
+        contract_text = _truncate_contract(contract_text, 3750, self.model)
         
-        prompt = PromptTemplates.build_prompt(
+        context, prompt = PromptTemplates.build_contract_prompt(
             'template_comparison',
-            contract_text=contract_text,
+            contract_text,
             contract_type=contract_type,
-            template_elements=', '.join(template_elements)
+            template_elements=', '.join(template_elements),
+            json_example=_JSON_EXAMPLES
         )
         
-        return self._call_gpt(prompt, json_mode=True)
+        return self._call_gpt(prompt, context=context, schema='template_comparison')
     
-    def generate_executive_summary(self, full_analysis: str) -> GPTResponse:
+    def generate_executive_summary(self, full_analysis: str,
+                                   on_delta: Optional[Callable[[str], None]] = None) -> GPTResponse:
         """
         Generate an executive summary of the analysis.
         
         Args:
             full_analysis: The complete analysis text
+            on_delta: Optional callback receiving the summary as it streams in
             
         Returns:
             GPTResponse with executive summary
@@ -386,7 +1142,31 @@ class GPTClient:
             full_analysis=full_analysis
         )
         
-        return self._call_gpt(prompt, max_tokens=1000)
+        return self._call_gpt(prompt, max_tokens=1000, on_delta=on_delta)
+    
+    def generate_negotiation_strategy(self, contract_summary: str, issues: str,
+                                      party_position: str,
+                                      on_delta: Optional[Callable[[str], None]] = None) -> GPTResponse:
+        """
+        Develop a negotiation strategy from a contract analysis.
+        
+        Args:
+            contract_summary: Summary of the contract
+            issues: The issues identified in the analysis
+            party_position: The position of the party being advised
+            on_delta: Optional callback receiving the strategy as it streams in
+            
+        Returns:
+            GPTResponse with negotiation strategy
+        """
+        prompt = PromptTemplates.build_prompt(
+            'negotiation_strategy',
+            contract_summary=contract_summary,
+            issues=issues,
+            party_position=party_position
+        )
+        
+        return self._call_gpt(prompt, on_delta=on_delta)
     
     def translate_to_hindi(self, english_summary: str) -> GPTResponse:
         """
@@ -405,55 +1185,310 @@ class GPTClient:
         
         return self._call_gpt(prompt)
     
-    def custom_query(self, contract_text: str, query: str) -> GPTResponse:
+    def custom_query(self, contract_text: str, query: str,
+                     on_delta: Optional[Callable[[str], None]] = None) -> GPTResponse:
         """
         Answer a custom query about the contract.
         
         Args:
             contract_text: The contract text
             query: The user's question
+            on_delta: Optional callback receiving the answer as it streams in
             
         Returns:
             GPTResponse with answer
         """
-        max_chars = 15000
-        if len(contract_text) > max_chars:
-            contract_text = contract_text[:max_chars] + "\n\n[... contract continues ...]"
+        contract_text = _truncate_contract(contract_text, 3750, self.model)
         
-        prompt = f"""Based on the following contract, please answer this question:
+        # The contract goes first, as in the template-based analyses
+        context = "CONTRACT TEXT:\n" + contract_text
+        prompt = f"""Based on the contract provided in the previous message, please answer this question:
 
 QUESTION: {query}
 
-CONTRACT TEXT:
-{contract_text}
-
 Provide a clear, helpful answer based on the contract content. If the answer cannot be determined from the contract, say so clearly."""
         
-        return self._call_gpt(prompt)
+        return self._call_gpt(prompt, on_delta=on_delta, context=context)
+    
+    # Analyses batch_analyze can run; 'compliance' also needs the contract
+    # type and 'unfavorable_terms' the party to protect
+    BATCH_ANALYSES = ('classify', 'summary', 'obligations', 'ambiguities',
+                      'compliance', 'unfavorable_terms')
     
     def batch_analyze(self, contract_text: str, 
-                      analyses: List[str]) -> Dict[str, GPTResponse]:
+                      analyses: List[str],
+                      contract_type: Optional[str] = None,
+                      party_name: str = "Business Owner") -> Dict[str, GPTResponse]:
         """
         Perform multiple analyses on a contract.
         
+        The analyses run concurrently (see batch_analyze_async), so this
+        takes about as long as the slowest one.
+        
         Args:
             contract_text: The contract to analyze
-            analyses: List of analysis types to perform
+            analyses: List of analysis types to perform (see BATCH_ANALYSES)
+            contract_type: Contract type for the compliance check; taken
+                from the classification when not given
+            party_name: The party to protect when detecting unfavorable terms
             
         Returns:
             Dictionary of analysis type to GPTResponse
         """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self._run_sync(self.batch_analyze_async(contract_text, analyses, contract_type, party_name))
+        
+        # asyncio.run() cannot be used inside a running event loop; callers
+        # there should await batch_analyze_async instead
         results = {}
         
         analysis_methods = {
-            'classify': lambda: self.classify_contract(contract_text),
-            'summary': lambda: self.generate_summary(contract_text),
-            'obligations': lambda: self.extract_obligations(contract_text),
-            'ambiguities': lambda: self.detect_ambiguities(contract_text),
+            'classify': self.classify_contract,
+            'summary': self.generate_summary,
+            'obligations': self.extract_obligations,
+            'ambiguities': self.detect_ambiguities,
+            'compliance': lambda text: self.check_compliance(
+                text, contract_type or self._contract_type(self.classify_contract(text))
+            ),
+            'unfavorable_terms': lambda text: self.detect_unfavorable_terms(text, party_name),
         }
         
         for analysis in analyses:
             if analysis in analysis_methods:
-                results[analysis] = analysis_methods[analysis]()
+                results[analysis] = analysis_methods[analysis](contract_text)
+        
+        return results
+    
+    @staticmethod
+    def _contract_type(classification: GPTResponse) -> str:
+        """The contract type from a classification response, or 'Other'."""
+        return (classification.parsed_json or {}).get('contract_type') or 'Other'
+    
+    async def batch_analyze_async(self, contract_text: str,
+                                  analyses: List[str],
+                                  contract_type: Optional[str] = None,
+                                  party_name: str = "Business Owner") -> Dict[str, GPTResponse]:
+        """
+        Perform multiple analyses on a contract concurrently.
+        
+        Args:
+            contract_text: The contract to analyze
+            analyses: List of analysis types to perform (see BATCH_ANALYSES)
+            contract_type: Contract type for the compliance check; taken
+                from the classification when not given
+            party_name: The party to protect when detecting unfavorable terms
+            
+        Returns:
+            Dictionary of analysis type to GPTResponse
+        """
+        selected = [analysis for analysis in dict.fromkeys(analyses) if analysis in self.BATCH_ANALYSES]
+        
+        # Embed every text the semantic cache will compare in one request;
+        # the analyses then find their embeddings already cached
+        if self.semantic_cache is not None:
+            semantic_requests = {
+                'classify': self._classify_contract_request,
+                'summary': self._generate_summary_request,
+            }
+            texts = [semantic_requests[analysis](contract_text)['text']
+                     for analysis in selected if analysis in semantic_requests]
+            if texts:
+                await asyncio.to_thread(self.semantic_cache.embed, texts)
+        
+        classification = None
+        if 'classify' in selected or ('compliance' in selected and contract_type is None):
+            classification = asyncio.ensure_future(self.classify_contract_async(contract_text))
+        
+        async def compliance() -> GPTResponse:
+            # Without a contract type, only the compliance check waits for
+            # the classification; everything else still runs alongside it
+            return await self.check_compliance_async(
+                contract_text, contract_type or self._contract_type(await classification)
+            )
+        
+        analysis_tasks = {
+            'classify': lambda: classification,
+            'summary': lambda: self.generate_summary_async(contract_text),
+            'obligations': lambda: self.extract_obligations_async(contract_text),
+            'ambiguities': lambda: self.detect_ambiguities_async(contract_text),
+            'compliance': compliance,
+            'unfavorable_terms': lambda: self.detect_unfavorable_terms_async(contract_text, party_name),
+        }
+        
+        responses = await asyncio.gather(*(analysis_tasks[analysis]() for analysis in selected))
+        
+        return dict(zip(selected, responses))
+
+
+class BulkAnalyzer:
+    """
+    Runs one analysis over many contracts.
+    
+    Offline work (such as an archive of contracts) goes through the OpenAI
+    Batch API, which costs half as much and has its own rate limits but
+    may take up to 24 hours. Latency-sensitive work is sent as ordinary
+    concurrent requests instead.
+    """
+    
+    # Analysis name -> (request builder, async method) on GPTClient
+    ANALYSES = {
+        'summary': ('_generate_summary_request', 'generate_summary_async'),
+        'unfavorable_terms': ('_detect_unfavorable_terms_request', 'detect_unfavorable_terms_async'),
+    }
+    
+    # Batch statuses that may still produce results
+    _PENDING_STATUSES = {'validating', 'in_progress', 'finalizing'}
+    
+    def __init__(self, gpt_client: GPTClient, latency_sensitive: bool = False):
+        self.gpt_client = gpt_client
+        self.latency_sensitive = latency_sensitive
+        # Results of latency-sensitive jobs, by job id
+        self._completed: Dict[str, Dict[str, GPTResponse]] = {}
+    
+    def build_batch_jsonl(self, contracts: Dict[str, str], analysis: str, **kwargs) -> str:
+        """
+        Build the Batch API input file for an analysis.
+        
+        Args:
+            contracts: Contract id (used as the custom_id) to contract text
+            analysis: One of ANALYSES
+            **kwargs: Other arguments of the analysis, such as party_name
+            
+        Returns:
+            JSONL text with one chat completion request per contract
+        """
+        build_request = getattr(self.gpt_client, self.ANALYSES[analysis][0])
+        
+        lines = []
+        for contract_id, contract_text in contracts.items():
+            body = self.gpt_client._batch_body(**build_request(contract_text, **kwargs))
+            lines.append(json.dumps({
+                "custom_id": contract_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            }, ensure_ascii=False))
+        
+        return "\n".join(lines) + "\n"
+    
+    def submit(self, contracts: Dict[str, str], analysis: str, **kwargs) -> str:
+        """
+        Start an analysis of many contracts.
+        
+        Args:
+            contracts: Contract id to contract text
+            analysis: One of ANALYSES
+            **kwargs: Other arguments of the analysis, such as party_name
+            
+        Returns:
+            Job id to pass to results(); a Batch API batch id unless
+            the analyzer is latency sensitive
+        """
+        if analysis not in self.ANALYSES:
+            raise ValueError(f"Unknown analysis: {analysis}")
+        
+        if not self._use_batch_api():
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return self._store_results(self.gpt_client._run_sync(self._analyze_now(contracts, analysis, kwargs)))
+            
+            # asyncio.run() cannot be used inside a running event loop;
+            # callers there should await submit_async instead
+            method = getattr(self.gpt_client, self.ANALYSES[analysis][1].removesuffix('_async'))
+            return self._store_results({contract_id: method(contract_text, **kwargs)
+                                        for contract_id, contract_text in contracts.items()})
+        
+        return self._submit_batch(contracts, analysis, kwargs)
+    
+    async def submit_async(self, contracts: Dict[str, str], analysis: str, **kwargs) -> str:
+        """Async version of submit."""
+        if analysis not in self.ANALYSES:
+            raise ValueError(f"Unknown analysis: {analysis}")
+        
+        if not self._use_batch_api():
+            return self._store_results(await self._analyze_now(contracts, analysis, kwargs))
         
+        # File upload and batch creation use the sync client, so keep them off the loop
+        return await asyncio.to_thread(self._submit_batch, contracts, analysis, kwargs)
+    
+    def _use_batch_api(self) -> bool:
+        return not self.latency_sensitive and self.gpt_client.is_configured()
+    
+    def _store_results(self, results: Dict[str, GPTResponse]) -> str:
+        """Keep the results of a latency-sensitive job and return its job id."""
+        job_id = f"sync-{len(self._completed)}"
+        self._completed[job_id] = results
+        return job_id
+    
+    def _submit_batch(self, contracts: Dict[str, str], analysis: str, kwargs: Dict) -> str:
+        """Upload the batch input file and create the batch; returns the batch id."""
+        client = self.gpt_client.client
+        batch_file = client.files.create(
+            file=("batch.jsonl", self.build_batch_jsonl(contracts, analysis, **kwargs).encode('utf-8')),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+    
+    async def _analyze_now(self, contracts: Dict[str, str], analysis: str,
+                           kwargs: Dict) -> Dict[str, GPTResponse]:
+        method = getattr(self.gpt_client, self.ANALYSES[analysis][1])
+        responses = await asyncio.gather(*(method(contract_text, **kwargs) for contract_text in contracts.values()))
+        return dict(zip(contracts, responses))
+    
+    def results(self, job_id: str) -> Optional[Dict[str, GPTResponse]]:
+        """
+        Get the results of a job started by submit().
+        
+        Args:
+            job_id: The id returned by submit()
+            
+        Returns:
+            Contract id to GPTResponse, or None while the batch is still running
+        """
+        if job_id in self._completed:
+            return self._completed[job_id]
+        
+        client = self.gpt_client.client
+        batch = client.batches.retrieve(job_id)
+        if batch.status in self._PENDING_STATUSES:
+            return None
+        
+        # Failed, expired and cancelled batches can still have partial output
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                for line in client.files.content(file_id).text.splitlines():
+                    if line.strip():
+                        record = _json_loads(line)
+                        results[record["custom_id"]] = self._parse_batch_record(record)
         return results
+    
+    def _parse_batch_record(self, record: Dict) -> GPTResponse:
+        """Convert one line of a batch output or error file into a GPTResponse."""
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        
+        if response.get("status_code") == 200:
+            choice = body["choices"][0]
+            if choice["message"].get("refusal"):
+                return GPTClient._refusal_response(choice["message"]["refusal"])
+            
+            content = choice["message"]["content"] or ""
+            tokens_used = (body.get("usage") or {}).get("total_tokens", 0)
+            # Structured outputs come back as a bare JSON object, which
+            # _build_response parses without json_mode
+            result = self.gpt_client._build_response(content, tokens_used, json_mode=False)
+            return GPTClient._check_complete(result, content.lstrip().startswith('{'),
+                                             choice.get("finish_reason"))
+        
+        error = record.get("error") or body.get("error") or {}
+        return GPTResponse(content="", success=False,
+                           error=f"API error: {error.get('message', 'batch request failed')}")
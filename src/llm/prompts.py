@@ -3,7 +3,231 @@ Prompt Templates for GPT-based Legal Analysis
 Structured prompts for various contract analysis tasks
 """
 
-from typing import Dict, List, Optional
+import functools
+import string
+from typing import Dict, List, Optional, Tuple
+
+
+def _strings() -> Dict:
+    return {"type": "array", "items": {"type": "string"}}
+
+
+def _object(properties: Dict) -> Dict:
+    # Structured outputs in strict mode need every property listed as required
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def _choice(*values: str) -> Dict:
+    return {"type": "string", "enum": list(values)}
+
+
+def _score() -> Dict:
+    # The templates' example responses were the only place giving the range
+    return {"type": "number", "description": "From 0.0 to 1.0"}
+
+
+_PARTY_TERMS = _object({
+    "name": {"type": "string"},
+    "obligations": _strings(),
+    "rights": _strings(),
+    "prohibitions": _strings(),
+})
+
+_RISK_ASSESSMENT = _object({
+    "risk_level": _choice("LOW", "MEDIUM", "HIGH"),
+    "risk_score": _score(),
+    "risk_factors": _strings(),
+    "potential_impact": {"type": "string"},
+    "red_flags": _strings(),
+    "mitigation_suggestions": _strings(),
+    "negotiation_points": _strings(),
+    "explanation": {"type": "string"},
+})
+
+# JSON schemas for the templates that ask for a JSON response, mirroring the
+# format shown in each template (used with structured outputs)
+RESPONSE_SCHEMAS: Dict[str, Dict] = {
+    'contract_classification': _object({
+        "contract_type": {"type": "string"},
+        "confidence": _score(),
+        "purpose": {"type": "string"},
+        "parties": _strings(),
+        "jurisdiction": {"type": "string"},
+        "subject_matter": {"type": "string"},
+        "reasoning": {"type": "string"},
+    }),
+    'risk_assessment': _RISK_ASSESSMENT,
+    # A top-level array is not allowed, so the list is wrapped in an object
+    'risk_assessment_batch': _object({
+        "assessments": {"type": "array", "items": _RISK_ASSESSMENT},
+    }),
+    'unfavorable_terms_detection': _object({
+        "unfavorable_terms": {"type": "array", "items": _object({
+            "clause_text": {"type": "string"},
+            "issue": {"type": "string"},
+            "severity": _choice("Minor", "Moderate", "Severe"),
+            "suggested_alternative": {"type": "string"},
+            "explanation": {"type": "string"},
+        })},
+        "one_sided_provisions": _strings(),
+        "hidden_risks": _strings(),
+        "missing_protections": _strings(),
+        "unusual_clauses": _strings(),
+        "compliance_concerns": _strings(),
+        "overall_assessment": {"type": "string"},
+        "priority_issues": _strings(),
+    }),
+    'compliance_check': _object({
+        "compliance_status": _choice("Compliant", "Partially Compliant", "Non-Compliant"),
+        "issues": {"type": "array", "items": _object({
+            "clause": {"type": "string"},
+            "law": {"type": "string"},
+            "issue": {"type": "string"},
+            "severity": _choice("Low", "Medium", "High"),
+            "recommendation": {"type": "string"},
+            "risk": {"type": "string"},
+        })},
+        "missing_requirements": _strings(),
+        "recommendations": _strings(),
+        "overall_assessment": {"type": "string"},
+    }),
+    'obligation_extraction': _object({
+        "party_1": _PARTY_TERMS,
+        "party_2": _PARTY_TERMS,
+        "mutual_obligations": _strings(),
+        "mutual_rights": _strings(),
+        "mutual_prohibitions": _strings(),
+    }),
+    'ambiguity_detection': _object({
+        "ambiguities": {"type": "array", "items": _object({
+            "text": {"type": "string"},
+            "type": _choice("vague_term", "undefined", "conflicting", "missing",
+                            "interpretation", "incomplete"),
+            "issue": {"type": "string"},
+            "suggestion": {"type": "string"},
+            "risk_level": _choice("Low", "Medium", "High"),
+        })},
+        "total_issues": {"type": "integer"},
+        "high_priority_issues": _strings(),
+        "recommendations": _strings(),
+    }),
+    'template_comparison': _object({
+        "present_clauses": _strings(),
+        "missing_clauses": _strings(),
+        "non_standard_clauses": _strings(),
+        "deviations": {"type": "array", "items": _object({
+            "standard": {"type": "string"},
+            "actual": {"type": "string"},
+            "impact": {"type": "string"},
+            "recommendation": {"type": "string"},
+        })},
+        "quality_score": _score(),
+        "overall_assessment": {"type": "string"},
+    }),
+}
+
+
+# Statutes named in both the system prompt and the compliance check
+_INDIAN_LAWS = (
+    "Indian Contract Act, 1872",
+    "Arbitration and Conciliation Act, 1996",
+    "Information Technology Act, 2000",
+    "Consumer Protection Act, 2019",
+    "Competition Act, 2002",
+)
+
+# Compliance check list: the statutes (checking consumer protection only
+# where it applies), then the other requirements
+_COMPLIANCE_AREAS = "\n".join(
+    f"{number}. {area}" for number, area in enumerate((
+        *(law + " (if applicable)" if law.startswith("Consumer Protection") else law
+          for law in _INDIAN_LAWS),
+        "Applicable labour laws (for employment contracts)",
+        "Stamp duty requirements",
+        "Registration requirements",
+    ), 1)
+)
+
+_EXPERTISE_AREAS = "\n".join(
+    f"- {area}" for area in (
+        *_INDIAN_LAWS,
+        "Labour laws applicable to employment contracts",
+        "Standard commercial contract practices in India",
+    )
+)
+
+
+# How the contract appears in the templates that analyse a whole contract
+_CONTRACT_BLOCK = "CONTRACT TEXT:\n{contract_text}"
+_CONTRACT_REFERENCE = "CONTRACT TEXT: provided in the previous message"
+
+
+# A template split into (literal text, field name or None) pieces
+_Segments = Tuple[Tuple[str, Optional[str]], ...]
+
+
+def _compile_template(template: str) -> _Segments:
+    """Split a template into its literal text and fields, unescaping {{ and }}."""
+    # The templates only use plain {name} fields, without format specs
+    return tuple((literal, field) for literal, field, _, _ in string.Formatter().parse(template))
+
+
+def _render(segments: _Segments, kwargs: Dict) -> str:
+    """Fill a compiled template; same result as str.format without re-parsing it."""
+    try:
+        if len(segments) == 2 and segments[0][1] is not None and segments[1][1] is None:
+            # A single field (the contract, clause or analysis text), the
+            # common case: two concatenations beat building a list to join
+            (prefix, field), (suffix, _) = segments
+            return prefix + str(kwargs[field]) + suffix
+        return "".join([literal if field is None else literal + str(kwargs[field])
+                        for literal, field in segments])
+    except KeyError as e:
+        raise ValueError(f"Missing required parameter: {e}")
+
+
+# Where the example response starts in the templates that ask for JSON
+_JSON_EXAMPLE_MARKER = "\n\nRespond in JSON format:\n"
+
+
+def _without_json_example(template: str) -> str:
+    """Drop a template's example JSON response, for requests that send its schema instead."""
+    end = template.find(_JSON_EXAMPLE_MARKER)
+    if end == -1:
+        return template
+    return template[:end] + "\n\nRespond in JSON format."
+
+
+def _template_text(template_name: str, json_example: bool) -> Optional[str]:
+    template = TEMPLATES.get(template_name)
+    if template is None or json_example:
+        return template
+    return _without_json_example(template)
+
+
+# Templates are compiled on first use, so each process only parses the
+# forms it actually sends
+@functools.lru_cache(maxsize=None)
+def _compiled_template(template_name: str, json_example: bool) -> Optional[_Segments]:
+    """Compile template_name, or return None for an unknown name."""
+    template = _template_text(template_name, json_example)
+    if template is None:
+        return None
+    return _compile_template(template)
+
+
+@functools.lru_cache(maxsize=None)
+def _contract_template(template_name: str, json_example: bool) -> Optional[_Segments]:
+    """Compile template_name with the contract replaced by a reference to it, or None."""
+    template = _template_text(template_name, json_example)
+    if template is None:
+        return None
+    return _compile_template(template.replace(_CONTRACT_BLOCK, _CONTRACT_REFERENCE))
 
 
 class PromptTemplates:
@@ -114,6 +338,54 @@ Respond in JSON format:
     "explanation": "..."
 }}"""
 
+    @staticmethod
+    def risk_assessment_batch() -> str:
+        """Prompt for assessing the risk of several clauses in one request."""
+        return """You are a legal risk analyst specializing in contract review for Indian SMEs.
+
+Analyze each of the following clauses for potential risks and concerns.
+
+CLAUSES (a JSON array of objects with "clause_type" and "clause_text"):
+{clauses_json}
+
+CONTRACT TYPE: {contract_type}
+
+For each clause, assess:
+
+1. **Risk Level**: Rate as LOW, MEDIUM, or HIGH
+2. **Risk Score**: Provide a score from 0.0 to 1.0
+3. **Risk Factors**: List specific risk factors identified
+4. **Potential Impact**: What could go wrong for the business
+5. **Red Flags**: Any particularly concerning language
+6. **Mitigation Suggestions**: How to reduce the risk
+7. **Negotiation Points**: What to ask for in negotiations
+
+Consider these risk categories:
+- Financial risk
+- Operational risk
+- Legal/compliance risk
+- Reputational risk
+- Strategic risk
+
+Assess every clause on its own. Return exactly one assessment per clause,
+in the same order: assessments[i] is the assessment of clause i.
+
+Respond in JSON format:
+{{
+    "assessments": [
+        {{
+            "risk_level": "LOW/MEDIUM/HIGH",
+            "risk_score": 0.0-1.0,
+            "risk_factors": ["factor1", "factor2"],
+            "potential_impact": "...",
+            "red_flags": ["flag1", "flag2"],
+            "mitigation_suggestions": ["suggestion1", "suggestion2"],
+            "negotiation_points": ["point1", "point2"],
+            "explanation": "..."
+        }}
+    ]
+}}"""
+
     @staticmethod
     def contract_summary() -> str:
         """Prompt for generating a contract summary."""
@@ -255,14 +527,7 @@ CONTRACT TEXT:
 CONTRACT TYPE: {contract_type}
 
 Check compliance with:
-1. Indian Contract Act, 1872
-2. Arbitration and Conciliation Act, 1996
-3. Information Technology Act, 2000
-4. Consumer Protection Act, 2019 (if applicable)
-5. Competition Act, 2002
-6. Applicable labour laws (for employment contracts)
-7. Stamp duty requirements
-8. Registration requirements
+""" + _COMPLIANCE_AREAS + """
 
 For each potential issue, provide:
 - The specific clause or provision
@@ -515,35 +780,73 @@ Guidelines:
 - Maintain confidentiality and professionalism
 
 You have expertise in:
-- Indian Contract Act, 1872
-- Arbitration and Conciliation Act, 1996
-- Information Technology Act, 2000
-- Consumer Protection Act, 2019
-- Competition Act, 2002
-- Labour laws applicable to employment contracts
-- Standard commercial contract practices in India"""
+""" + _EXPERTISE_AREAS
 
     @staticmethod
-    def build_prompt(template_name: str, **kwargs) -> str:
+    def build_prompt(template_name: str, *, json_example: bool = True, **kwargs) -> str:
         """
         Build a complete prompt from template and parameters.
         
         Args:
             template_name: Name of the template method
+            json_example: Keep the example JSON response; leave it out when
+                the request sends the template's schema (RESPONSE_SCHEMAS)
             **kwargs: Parameters to fill in the template
             
         Returns:
             Formatted prompt string
         """
-        templates = PromptTemplates()
-        template_method = getattr(templates, template_name, None)
+        segments = _compiled_template(template_name, json_example)
         
-        if template_method is None:
+        if segments is None:
             raise ValueError(f"Unknown template: {template_name}")
         
-        template = template_method()
+        return _render(segments, kwargs)
+    
+    @staticmethod
+    def build_contract_prompt(template_name: str, contract_text: str, *,
+                              json_example: bool = True, **kwargs) -> Tuple[str, str]:
+        """
+        Build a contract prompt as two messages: the contract, then the instructions.
+        
+        With the contract first, every analysis of one contract starts with
+        the same system prompt and contract text, a prefix the API caches.
+        
+        Args:
+            template_name: Name of a template containing the contract text
+            contract_text: The (already truncated) contract text
+            json_example: Keep the example JSON response (see build_prompt)
+            **kwargs: Other parameters to fill in the template
+            
+        Returns:
+            Tuple of (contract message, instructions message)
+        """
+        # The templates are constants, so each is rewritten only once
+        segments = _contract_template(template_name, json_example)
+        
+        if segments is None:
+            raise ValueError(f"Unknown template: {template_name}")
         
-        try:
-            return template.format(**kwargs)
-        except KeyError as e:
-            raise ValueError(f"Missing required parameter: {e}")
+        return "CONTRACT TEXT:\n" + contract_text, _render(segments, kwargs)
+
+
+# Template name -> template text, for build_prompt and build_contract_prompt
+TEMPLATES: Dict[str, str] = {
+    name: getattr(PromptTemplates, name)()
+    for name in (
+        'contract_classification',
+        'clause_explanation',
+        'risk_assessment',
+        'risk_assessment_batch',
+        'contract_summary',
+        'unfavorable_terms_detection',
+        'alternative_clause_suggestion',
+        'compliance_check',
+        'obligation_extraction',
+        'ambiguity_detection',
+        'template_comparison',
+        'negotiation_strategy',
+        'hindi_translation',
+        'executive_summary',
+    )
+}
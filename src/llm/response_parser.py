@@ -9,6 +9,55 @@ from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field
 
 
+# Code fences tried in order when a response is not bare JSON
+_JSON_FENCE_PATTERNS = (
+    re.compile(r'```json\s*([\s\S]*?)\s*```'),
+    re.compile(r'```\s*([\s\S]*?)\s*```'),
+)
+# Dash/star, numbered and "a)" bullets, each taking the rest of its line
+_BULLET_RE = re.compile(r'^[ \t]*(?:[-•*]|\d+\.|[a-z]\))[ \t]*(.+)$', re.MULTILINE)
+_SENTENCE_END_RE = re.compile(r'[.!?]+')
+_HEADER_RE = re.compile(r'^#{1,3}\s+(.+)$')
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+_LIST_ITEM_RE = re.compile(r'- (.+)')
+
+
+def _extract_first_json_object(text: str) -> Optional[str]:
+    """
+    Return the first balanced {...} object in text, or None.
+
+    Single left-to-right scan tracking brace depth; braces inside JSON
+    strings (including escaped quotes) are ignored.
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+
+    return None
+
+
 @dataclass
 class ParsedRiskAssessment:
     """Structured risk assessment data."""
@@ -106,21 +155,22 @@ class ResponseParser:
             pass
         
         # Try to extract JSON from markdown code blocks
-        patterns = [
-            r'```json\s*([\s\S]*?)\s*```',
-            r'```\s*([\s\S]*?)\s*```',
-            r'\{[\s\S]*\}'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, response_text)
+        for pattern in _JSON_FENCE_PATTERNS:
+            match = pattern.search(response_text)
             if match:
                 try:
-                    json_str = match.group(1) if '```' in pattern else match.group(0)
-                    return json.loads(json_str.strip())
+                    return json.loads(match.group(1).strip())
                 except json.JSONDecodeError:
                     continue
         
+        # Fall back to the first balanced object in the text
+        json_str = _extract_first_json_object(response_text)
+        if json_str:
+            try:
+                return json.loads(json_str)
+            except json.JSONDecodeError:
+                pass
+        
         return None
     
     def parse_classification(self, response: Union[str, Dict]) -> ParsedContractClassification:
@@ -342,22 +392,12 @@ class ResponseParser:
         Returns:
             List of key points
         """
-        points = []
-        
         # Look for bullet points
-        bullet_patterns = [
-            r'[-•*]\s*(.+?)(?=\n[-•*]|\n\n|$)',
-            r'\d+\.\s*(.+?)(?=\n\d+\.|\n\n|$)',
-            r'[a-z]\)\s*(.+?)(?=\n[a-z]\)|\n\n|$)'
-        ]
-        
-        for pattern in bullet_patterns:
-            matches = re.findall(pattern, text, re.MULTILINE)
-            points.extend([m.strip() for m in matches if m.strip()])
+        points = [m.strip() for m in _BULLET_RE.findall(text) if m.strip()]
         
         # If no bullets found, split by sentences
         if not points:
-            sentences = re.split(r'[.!?]+', text)
+            sentences = _SENTENCE_END_RE.split(text)
             points = [s.strip() for s in sentences if len(s.strip()) > 20][:10]
         
         return points
@@ -378,14 +418,14 @@ class ResponseParser:
         
         for line in text.split('\n'):
             # Check for headers
-            header_match = re.match(r'^#{1,3}\s+(.+)$', line)
+            header_match = _HEADER_RE.match(line)
             if header_match:
                 # Save previous section
                 if current_content:
                     sections[current_section] = '\n'.join(current_content).strip()
                 
                 current_section = header_match.group(1).strip().lower()
-                current_section = re.sub(r'[^\w\s]', '', current_section)
+                current_section = _NON_WORD_RE.sub('', current_section)
                 current_section = current_section.replace(' ', '_')
                 current_content = []
             else:
@@ -521,8 +561,8 @@ class ResponseParser:
         md = self._format_markdown(data)
         # Basic markdown to HTML conversion
         html = md.replace('### ', '<h3>').replace('\n\n', '</p><p>')
-        html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
-        html = re.sub(r'- (.+)', r'<li>\1</li>', html)
+        html = _BOLD_RE.sub(r'<strong>\1</strong>', html)
+        html = _LIST_ITEM_RE.sub(r'<li>\1</li>', html)
         return f'<div class="analysis-result">{html}</div>'
     
     def _list_to_md(self, items: List[str]) -> str:
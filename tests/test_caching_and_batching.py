@@ -0,0 +1,528 @@
+"""
+Test Script for Caching and Batching
+Validates the response, extraction, report and semantic caches and the
+batched GPT paths with fake OpenAI clients (no API key or network needed)
+"""
+
+import sys
+import os
+import io
+import json
+import asyncio
+from types import SimpleNamespace
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm import gpt_client
+from src.llm.gpt_client import GPTClient, GPTResponse, SemanticCache, BulkAnalyzer
+from src.llm.response_parser import ResponseParser
+from src.analysis import similarity_matcher
+from src.analysis.similarity_matcher import SimilarityMatcher
+from src.document import extractor as document_extractor
+from src.document.extractor import DocumentExtractor
+from src.document import pdf_generator
+from src.document.pdf_generator import PDFReportGenerator
+
+
+SAMPLE_CLAUSE = "Either Party may terminate this Agreement with 90 days' written notice."
+
+SAMPLE_CONTRACT = """
+SERVICE AGREEMENT
+
+This Agreement is made on 1 March 2026 between Acme Solutions Private Limited
+and Ravi Kumar for a monthly fee of Rs. 50,000.
+
+1. The Service Provider shall deliver the services described in Schedule A.
+2. Either Party may terminate this Agreement with 30 days' written notice.
+"""
+
+
+def _completion(content: str, finish_reason: str = "stop", tokens: int = 10):
+    """A chat completion as returned by the OpenAI SDK."""
+    message = SimpleNamespace(content=content, refusal=None)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=message, finish_reason=finish_reason)],
+        usage=SimpleNamespace(total_tokens=tokens)
+    )
+
+
+class FakeCompletions:
+    """Answers every chat completion with the next reply (the last one repeats)."""
+    
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = []
+    
+    def _reply(self, kwargs):
+        self.requests.append(kwargs)
+        reply = self.replies[min(len(self.requests), len(self.replies)) - 1]
+        return reply(kwargs) if callable(reply) else reply
+    
+    def create(self, **kwargs):
+        return self._reply(kwargs)
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    async def create(self, **kwargs):
+        await asyncio.sleep(0)
+        return self._reply(kwargs)
+
+
+class FakeEmbeddings:
+    """Embeds each text as a fixed vector chosen by the test."""
+    
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.calls = 0
+    
+    def create(self, model, input):
+        self.calls += 1
+        return SimpleNamespace(data=[SimpleNamespace(embedding=self.vectors[text]) for text in input])
+
+
+def _fake_client(completions=None, **services) -> GPTClient:
+    """A configured GPTClient whose API calls go to the given fakes."""
+    client = GPTClient(api_key="test-key")
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions), **services)
+    client.semantic_cache = None
+    return client
+
+
+def _use_async_completions(client: GPTClient, completions: FakeAsyncCompletions):
+    """Make the client's async calls in the running event loop go to completions."""
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    client._async_semaphore = asyncio.Semaphore(4)
+    client._async_loop = asyncio.get_running_loop()
+
+
+def test_response_cache():
+    """Test the exact-match GPT response cache."""
+    print("\n" + "="*50)
+    print("Testing Response Cache")
+    print("="*50)
+    
+    gpt_client._response_cache.clear()
+    completions = FakeCompletions(_completion('{"items": [1]}'))
+    client = _fake_client(completions)
+    
+    first = client.custom_query(SAMPLE_CONTRACT, "List the payment terms")
+    first.parsed_json["items"].append(2)
+    second = client.custom_query(SAMPLE_CONTRACT, "List the payment terms")
+    assert len(completions.requests) == 1
+    assert second.parsed_json == {"items": [1]}
+    print(f"✓ Repeat request served from cache: {len(completions.requests)} API call")
+    print(f"✓ Cached copy unaffected by caller changes: {second.parsed_json}")
+    
+    # Responses cut off at the token limit are returned but never cached
+    completions = FakeCompletions(_completion("A partial summ", finish_reason="length"))
+    client = _fake_client(completions)
+    truncated = client.custom_query(SAMPLE_CONTRACT, "Summarize the contract")
+    client.custom_query(SAMPLE_CONTRACT, "Summarize the contract")
+    assert truncated.success and truncated.truncated
+    assert len(completions.requests) == 2
+    print(f"✓ Truncated response not cached: {len(completions.requests)} API calls")
+    
+    # Streamed responses are checked for truncation the same way
+    def stream(kwargs):
+        for content, finish_reason in (("Partial", None), (None, "length")):
+            delta = SimpleNamespace(content=content, refusal=None)
+            yield SimpleNamespace(usage=None,
+                                  choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+    
+    completions = FakeCompletions(stream)
+    client = _fake_client(completions)
+    deltas = []
+    streamed = client.custom_query(SAMPLE_CONTRACT, "Explain the fees", on_delta=deltas.append)
+    client.custom_query(SAMPLE_CONTRACT, "Explain the fees", on_delta=deltas.append)
+    assert streamed.truncated and deltas == ["Partial", "Partial"]
+    assert len(completions.requests) == 2
+    print(f"✓ Truncated stream not cached: {len(completions.requests)} API calls")
+    
+    return True
+
+
+def test_semantic_cache():
+    """Test semantic cache hits and misses by namespace."""
+    print("\n" + "="*50)
+    print("Testing Semantic Cache")
+    print("="*50)
+    
+    embeddings = FakeEmbeddings({
+        "clause": [1.0, 0.0, 0.0],
+        "reworded clause": [1.0, 0.05, 0.0],
+        "unrelated clause": [0.0, 1.0, 0.0],
+    })
+    cache = SemanticCache(SimpleNamespace(embeddings=embeddings), threshold=0.95)
+    
+    vectors = cache.embed(["clause", "reworded clause", "unrelated clause", "clause"])
+    assert embeddings.calls == 1
+    cache.embed(["clause"])
+    assert embeddings.calls == 1
+    print(f"✓ Embeddings fetched in one request and reused: {embeddings.calls} call")
+    
+    cached = GPTResponse(content='{"risk_level": "LOW"}', parsed_json={"risk_level": "LOW"})
+    cache.add(("assess_clause_risk", "termination"), vectors[0], cached)
+    
+    hit = cache.lookup(("assess_clause_risk", "termination"), vectors[1])
+    assert hit is not None and hit.parsed_json == {"risk_level": "LOW"}
+    hit.parsed_json["risk_level"] = "HIGH"
+    assert cache.lookup(("assess_clause_risk", "termination"), vectors[0]).parsed_json["risk_level"] == "LOW"
+    print("✓ Near-duplicate text hits, and each hit is an independent copy")
+    
+    assert cache.lookup(("assess_clause_risk", "termination"), vectors[2]) is None
+    assert cache.lookup(("assess_clause_risk", "payment"), vectors[0]) is None
+    assert cache.lookup(("explain_clause", "termination"), vectors[0]) is None
+    print("✓ Dissimilar text, another clause type and another method all miss")
+    
+    # Contracts from one template with different parties or amounts get
+    # different namespaces
+    other_parties = SAMPLE_CONTRACT.replace("Acme", "Zenith")
+    other_amount = SAMPLE_CONTRACT.replace("50,000", "75,000")
+    client = _fake_client()
+    namespace = client._classify_contract_request(SAMPLE_CONTRACT)['namespace']
+    assert namespace == client._classify_contract_request(SAMPLE_CONTRACT)['namespace']
+    assert namespace != client._classify_contract_request(other_parties)['namespace']
+    assert namespace != client._generate_summary_request(SAMPLE_CONTRACT)['namespace']
+    assert namespace != client._classify_contract_request(other_amount)['namespace']
+    print("✓ Classification namespace separates parties and amounts")
+    
+    return True
+
+
+def test_risk_batch():
+    """Test batched clause risk assessment."""
+    print("\n" + "="*50)
+    print("Testing Batched Risk Assessment")
+    print("="*50)
+    
+    gpt_client._response_cache.clear()
+    clauses = [(f"Clause {i}: {SAMPLE_CLAUSE}", "termination") for i in range(3)]
+    
+    assessments = [{"risk_level": level} for level in ("LOW", "MEDIUM", "HIGH")]
+    completions = FakeCompletions(_completion(json.dumps({"assessments": assessments}), tokens=30))
+    results = _fake_client(completions).assess_clause_risk_batch(clauses, "Service Agreement")
+    assert [r.parsed_json["risk_level"] for r in results] == ["LOW", "MEDIUM", "HIGH"]
+    assert [r.tokens_used for r in results] == [30, 0, 0]
+    print(f"✓ One request for {len(clauses)} clauses: {len(completions.requests)} API call")
+    
+    # A response with the wrong number of assessments cannot be aligned
+    # with the clauses, so every clause in the batch fails
+    completions = FakeCompletions(_completion(json.dumps({"assessments": assessments[:2]})))
+    results = _fake_client(completions).assess_clause_risk_batch(
+        [(text + " (amended)", clause_type) for text, clause_type in clauses], "Service Agreement"
+    )
+    assert len(results) == 3 and not any(r.success for r in results)
+    print(f"✓ Misaligned batch fails every clause: {results[0].error}")
+    
+    # The misaligned reply is not cached, so retrying the same batch asks again
+    gpt_client._response_cache.clear()
+    completions = FakeCompletions(_completion(json.dumps({"assessments": assessments[:2]})),
+                                  _completion(json.dumps({"assessments": assessments})))
+    client = _fake_client(completions)
+    failed = client.assess_clause_risk_batch(clauses, "Service Agreement")
+    retried = client.assess_clause_risk_batch(clauses, "Service Agreement")
+    assert not any(r.success for r in failed) and all(r.success for r in retried)
+    assert len(completions.requests) == 2
+    print(f"✓ Retry of a misaligned batch is not served from cache: {len(completions.requests)} API calls")
+    
+    return True
+
+
+def test_contract_truncation():
+    """Test that truncation falls back to characters when tiktoken fails."""
+    print("\n" + "="*50)
+    print("Testing Contract Truncation")
+    print("="*50)
+    
+    loads = []
+    
+    def unknown_model(model):
+        raise KeyError(model)
+    
+    def unreachable(name):
+        loads.append(name)
+        raise OSError("BPE file download failed")
+    
+    saved = sys.modules.get("tiktoken")
+    sys.modules["tiktoken"] = SimpleNamespace(encoding_for_model=unknown_model, get_encoding=unreachable)
+    gpt_client._get_encoding.cache_clear()
+    gpt_client._truncate_contract.cache_clear()
+    try:
+        first = gpt_client._truncate_contract("a" * 1000, 100, "unknown-model")
+        second = gpt_client._truncate_contract("b" * 1000, 100, "unknown-model")
+    finally:
+        if saved is None:
+            del sys.modules["tiktoken"]
+        else:
+            sys.modules["tiktoken"] = saved
+        gpt_client._get_encoding.cache_clear()
+        gpt_client._truncate_contract.cache_clear()
+    
+    assert first == "a" * 400 + gpt_client._CONTINUES_MARKER
+    assert second.startswith("b" * 400) and loads == ["o200k_base"]
+    print(f"✓ Character budget used after a failed encoding load: {len(first)} chars")
+    print(f"✓ Failed load not retried: {len(loads)} attempt")
+    
+    return True
+
+
+def test_bulk_analyzer():
+    """Test Batch API input files and result parsing."""
+    print("\n" + "="*50)
+    print("Testing Bulk Analyzer")
+    print("="*50)
+    
+    client = _fake_client()
+    analyzer = BulkAnalyzer(client)
+    
+    jsonl = analyzer.build_batch_jsonl({"c1": SAMPLE_CONTRACT, "c2": "Another contract"},
+                                       "unfavorable_terms", party_name="Ravi Kumar")
+    records = [json.loads(line) for line in jsonl.splitlines()]
+    assert [r["custom_id"] for r in records] == ["c1", "c2"]
+    assert all(r["url"] == "/v1/chat/completions" and r["body"]["messages"] for r in records)
+    assert "extra_body" not in records[0]["body"]
+    print(f"✓ JSONL requests built: {len(records)}")
+    
+    def output_line(custom_id, status_code, body):
+        return {"custom_id": custom_id, "response": {"status_code": status_code, "body": body}, "error": None}
+    
+    def choice(message, finish_reason="stop"):
+        return {"choices": [{"message": message, "finish_reason": finish_reason}],
+                "usage": {"total_tokens": 12}}
+    
+    ok = analyzer._parse_batch_record(output_line("c1", 200, choice({"content": '{"issues": []}'})))
+    assert ok.success and ok.parsed_json == {"issues": []} and ok.tokens_used == 12
+    
+    refused = analyzer._parse_batch_record(
+        output_line("c2", 200, choice({"content": None, "refusal": "Cannot help"}))
+    )
+    truncated = analyzer._parse_batch_record(
+        output_line("c3", 200, choice({"content": '{"issues": ['}, finish_reason="length"))
+    )
+    failed = analyzer._parse_batch_record(
+        output_line("c4", 400, {"error": {"message": "Invalid schema"}})
+    )
+    # Lines of the batch error file carry the error outside the response
+    expired = analyzer._parse_batch_record(
+        {"custom_id": "c5", "response": None, "error": {"message": "Batch expired"}}
+    )
+    assert not any(r.success for r in (refused, truncated, failed, expired))
+    assert "Invalid schema" in failed.error and "Batch expired" in expired.error
+    print(f"✓ Output and error file records parsed: {ok.parsed_json}, {expired.error}")
+    
+    # Latency-sensitive jobs run as ordinary requests, also from async code
+    completions = FakeCompletions(_completion('{"overall_assessment": "Fair"}'))
+    client = _fake_client(completions)
+    analyzer = BulkAnalyzer(client, latency_sensitive=True)
+    
+    async def submit_in_loop():
+        job_id = analyzer.submit({"c1": SAMPLE_CONTRACT}, "unfavorable_terms", party_name="Ravi Kumar")
+        return analyzer.results(job_id)
+    
+    results = asyncio.run(submit_in_loop())
+    assert results["c1"].parsed_json == {"overall_assessment": "Fair"}
+    print("✓ Latency-sensitive submit works inside a running event loop")
+    
+    return True
+
+
+def test_concurrent_analyses():
+    """Test the concurrent multi-clause and multi-analysis paths."""
+    print("\n" + "="*50)
+    print("Testing Concurrent Analyses")
+    print("="*50)
+    
+    gpt_client._response_cache.clear()
+    client = _fake_client()
+    
+    def reply(kwargs):
+        return _completion(json.dumps({"prompt": kwargs["messages"][-1]["content"]}))
+    
+    async def run():
+        completions = FakeAsyncCompletions(reply)
+        _use_async_completions(client, completions)
+        explanations = await client.explain_clause_many_async(
+            [(f"Clause {i}: {SAMPLE_CLAUSE}", "termination") for i in range(4)]
+        )
+        analyses = await client.batch_analyze_async(
+            SAMPLE_CONTRACT, ["summary", "obligations", "compliance"], contract_type="Service Agreement"
+        )
+        return explanations, analyses, completions
+    
+    explanations, analyses, completions = asyncio.run(run())
+    assert len(explanations) == 4 and all(r.success for r in explanations)
+    assert len({r.content for r in explanations}) == 4
+    assert set(analyses) == {"summary", "obligations", "compliance"}
+    assert len(completions.requests) == 7
+    print(f"✓ Clause explanations in input order: {len(explanations)}")
+    print(f"✓ Analyses run concurrently: {sorted(analyses)}")
+    
+    # Sync wrappers close the async client (and its connection pool) they open
+    async def open_client():
+        return client._get_async_client()[0]
+    
+    opened = client._run_sync(open_client())
+    assert opened.is_closed() and client.async_client is None
+    print("✓ Async client closed after a sync batch run")
+    
+    return True
+
+
+def test_extraction_cache():
+    """Test the document extraction cache."""
+    print("\n" + "="*50)
+    print("Testing Extraction Cache")
+    print("="*50)
+    
+    document_extractor._extract_cache.clear()
+    extractor = DocumentExtractor()
+    
+    first = extractor.extract(file_content=b"The Employee shall be paid monthly.", filename="a.txt")
+    first.metadata["reviewed"] = True
+    repeat = extractor.extract(file_content=b"The Employee shall be paid monthly.", filename="b.txt")
+    assert repeat.filename == "b.txt" and "reviewed" not in repeat.metadata
+    assert len(document_extractor._extract_cache) == 1
+    print(f"✓ Repeat upload served from cache as an independent copy: {repeat.filename}")
+    
+    info = extractor.get_file_info(file_content=b"The Employee shall be paid monthly.", filename="a.txt")
+    assert info['file_hash'] == first.file_hash == repeat.file_hash
+    print(f"✓ Audit fingerprint matches get_file_info: {first.file_hash}")
+    
+    # Same length, different bytes: keyed by a digest of the content itself
+    other = extractor.extract(file_content=b"The Employer shall be paid weekly..", filename="c.txt")
+    assert other.text == "The Employer shall be paid weekly.."
+    assert len(document_extractor._extract_cache) == 2
+    print(f"✓ Different content of the same length misses: {other.text}")
+    
+    # Malformed files are rejected before any parser runs
+    assert not extractor.extract(file_content=b"not a pdf", filename="x.pdf").extraction_success
+    assert not extractor.extract(file_content=b"PK\x03\x04truncated", filename="x.docx").extraction_success
+    print("✓ Malformed PDF and truncated DOCX rejected")
+    
+    batch = extractor.extract_batch(
+        [("one.txt", b"First contract text."), ("two.txt", b"Second contract text.")],
+        workers=2, use_processes=False
+    )
+    assert [doc.text for doc in batch] == ["First contract text.", "Second contract text."]
+    print(f"✓ Batch extraction keeps input order: {[doc.filename for doc in batch]}")
+    
+    return True
+
+
+def test_report_caches():
+    """Test the PDF report and template comparison caches."""
+    print("\n" + "="*50)
+    print("Testing Report Caches")
+    print("="*50)
+    
+    pdf_generator._report_cache.clear()
+    generator = PDFReportGenerator()
+    args = ({"filename": "contract.txt"}, "A short summary.", ["Point one"], "low", 0.2)
+    
+    first = generator.generate_summary_report(*args)
+    rendered = bytes(first)
+    first[:] = b"CORRUPT"
+    second = generator.generate_summary_report(*args)
+    third = generator.generate_summary_report(*args)
+    assert second == third == rendered and isinstance(second, bytes)
+    assert len(pdf_generator._report_cache) == 1
+    print(f"✓ Repeat summary report served from cache: {len(second)} bytes")
+    
+    class Point:
+        def __init__(self, text):
+            self.text = text
+    
+    generator.generate_summary_report({"filename": "contract.txt"}, "A short summary.",
+                                      [Point("Opaque point")], "low", 0.2)
+    assert len(pdf_generator._report_cache) == 1
+    print("✓ Arguments JSON cannot encode skip the cache")
+    
+    out = io.BytesIO()
+    assert generator.generate_clause_report([{"title": "Termination", "content": SAMPLE_CLAUSE}], out=out) is None
+    assert out.getvalue().startswith(b"%PDF-") and len(pdf_generator._report_cache) == 1
+    print("✓ Report written to a stream is not cached")
+    
+    bulk = PDFReportGenerator.generate_reports_bulk(
+        [{"report_type": "clause", "clauses": [{"title": "Payment", "content": "Fees are due monthly."}]}],
+        workers=1
+    )
+    assert bulk[0].startswith(b"%PDF-")
+    print(f"✓ Bulk reports generated: {len(bulk)}")
+    
+    similarity_matcher._report_cache.clear()
+    report = SimilarityMatcher().compare_to_template(SAMPLE_CONTRACT, "Service Agreement")
+    report.recommendations.append("Changed by caller")
+    cached = SimilarityMatcher().compare_to_template(SAMPLE_CONTRACT, "Service Agreement")
+    assert "Changed by caller" not in cached.recommendations
+    assert len(similarity_matcher._report_cache) == 1
+    print("✓ Comparison report cache shared across matchers, with independent copies")
+    
+    return True
+
+
+def test_response_parser():
+    """Test JSON extraction from free-form responses."""
+    print("\n" + "="*50)
+    print("Testing Response Parser")
+    print("="*50)
+    
+    parser = ResponseParser()
+    assert parser.parse_json_response('Result: {"a": {"b": "}"}} and {"c": 1}') == {"a": {"b": "}"}}
+    assert parser.parse_json_response('```json\n{"a": 1}\n```') == {"a": 1}
+    assert parser.parse_json_response("No JSON here") is None
+    print("✓ First balanced object extracted")
+    
+    points = parser.extract_key_points("- First point\n1. Second point\na) Third point")
+    assert points == ["First point", "Second point", "Third point"]
+    print(f"✓ Key points: {points}")
+    
+    return True
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("\n" + "="*60)
+    print("CACHING AND BATCHING - TEST SUITE")
+    print("="*60)
+    
+    tests = [
+        ("Response Cache", test_response_cache),
+        ("Semantic Cache", test_semantic_cache),
+        ("Batched Risk Assessment", test_risk_batch),
+        ("Contract Truncation", test_contract_truncation),
+        ("Bulk Analyzer", test_bulk_analyzer),
+        ("Concurrent Analyses", test_concurrent_analyses),
+        ("Extraction Cache", test_extraction_cache),
+        ("Report Caches", test_report_caches),
+        ("Response Parser", test_response_parser),
+    ]
+    
+    results = []
+    for name, test_func in tests:
+        try:
+            success = test_func()
+            results.append((name, success, None))
+        except Exception as e:
+            results.append((name, False, str(e)))
+            print(f"✗ Error: {e!r}")
+    
+    # Summary
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+    
+    passed = sum(1 for _, success, _ in results if success)
+    total = len(results)
+    
+    for name, success, error in results:
+        status = "✓ PASS" if success else f"✗ FAIL: {error}"
+        print(f"  {name}: {status}")
+    
+    print(f"\nTotal: {passed}/{total} tests passed")
+    print("="*60)
+    
+    return passed == total
+
+
+if __name__ == "__main__":
+    success = run_all_tests()
+    sys.exit(0 if success else 1)